@@ -0,0 +1,32 @@
+"""JSON 编解码，优先使用 orjson，未安装时回退到标准库"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+
+    def json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+
+    def json_dumps_pretty(obj: Any) -> bytes:
+        """缩进 2 格、保留非 ASCII 字符的 UTF-8 字节，用于写入数据文件"""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+
+    json_loads = orjson.loads
+except ImportError:
+    json_dumps = json.dumps
+
+    def json_dumps_pretty(obj: Any) -> bytes:
+        """缩进 2 格、保留非 ASCII 字符的 UTF-8 字节，用于写入数据文件"""
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode()
+
+    json_loads = json.loads
+
+# 可选的 ssrjson 解码 str 时最快，安装后优先用于解析
+try:
+    import ssrjson
+
+    json_loads = ssrjson.loads
+except ImportError:
+    pass
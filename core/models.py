@@ -1,17 +1,25 @@
 """Minecraft 适配器插件的数据模型"""
 
+from collections.abc import Mapping
 from dataclasses import dataclass, field
 from enum import Enum
+from functools import cached_property
+from types import MappingProxyType
 from typing import Any, TypeVar
 
 E = TypeVar("E", bound=Enum)
 
 
+# 只读的空映射，用作嵌套字段缺失时的默认值，避免每次解析都新建空字典
+_EMPTY: Mapping[str, Any] = MappingProxyType({})
+
+
 def safe_enum(enum_class: type[E], value: str, default: E) -> E:
     """安全地解析枚举值，如果无效则返回默认值"""
+    # 直接查值到成员的映射，避免 Enum 构造调用与异常开销
     try:
-        return enum_class(value)
-    except ValueError:
+        return enum_class._value2member_map_.get(value, default)
+    except TypeError:  # 不可哈希的值
         return default
 
 
@@ -236,8 +244,8 @@ class MCMessageSource:
 
     @classmethod
     def from_dict(cls, data: dict) -> "MCMessageSource":
-        server = data.get("server", {})
-        player = data.get("player", {})
+        server = data.get("server") or _EMPTY
+        player = data.get("player") or _EMPTY
         return cls(
             type=safe_enum(SourceType, data.get("type", "PLAYER"), SourceType.PLAYER),
             server_name=server.get("name", ""),
@@ -289,19 +297,17 @@ class MCMessage:
 
     @classmethod
     def from_dict(cls, data: dict) -> "MCMessage":
-        source = None
-        target = None
-        if "source" in data:
-            source = MCMessageSource.from_dict(data["source"])
-        if "target" in data:
-            target = MCMessageTarget.from_dict(data["target"])
+        # 每个字段只查一次字典
+        source = data.get("source")
+        target = data.get("target")
+        payload = data.get("payload")
 
         return cls(
             type=safe_enum(MessageType, data.get("type", "ERROR"), MessageType.ERROR),
             id=data.get("id", ""),
-            source=source,
-            target=target,
-            payload=data.get("payload", {}),
+            source=MCMessageSource.from_dict(source) if source is not None else None,
+            target=MCMessageTarget.from_dict(target) if target is not None else None,
+            payload=payload if payload is not None else {},
             timestamp=data.get("timestamp", 0),
             reply_to=data.get("replyTo", ""),
         )
@@ -336,7 +342,7 @@ class ServerConfig:
     forward_chat_to_astrbot: bool = True
     forward_chat_format: str = "<{player}> {message}"
     forward_join_leave_to_astrbot: bool = False
-    target_sessions: list[str] = field(default_factory=list)
+    target_sessions: tuple[str, ...] = ()
     auto_forward_prefix: str = "*"
     mark_option: str = "emoji"
     # 命令配置
@@ -346,11 +352,24 @@ class ServerConfig:
     bind_enable: bool = True
     custom_cmd_list: list[str] = field(default_factory=list)
 
+    @cached_property
+    def cmd_name_set(self) -> frozenset[str]:
+        """小写化的指令黑白名单集合，用于快速成员判断"""
+        return frozenset(c.lower() for c in self.cmd_list)
+
     @classmethod
     def from_dict(cls, data: dict) -> "ServerConfig":
         server = data.get("server", {})
         message = data.get("message", {})
         cmd = data.get("cmd", {})  # cmd 与 message 处于同一层级，不是嵌套关系
+        # 目标会话在加载时一次性清理空白、空项与重复项，保存为不可变元组
+        target_sessions = tuple(
+            dict.fromkeys(
+                umo
+                for umo in (s.strip() for s in message.get("target_sessions", []))
+                if umo
+            )
+        )
 
         return cls(
             enabled=data.get("enabled", True),
@@ -367,11 +386,11 @@ class ServerConfig:
             forward_join_leave_to_astrbot=message.get(
                 "forward_join_leave_to_astrbot", False
             ),
-            target_sessions=message.get("target_sessions", []),
+            target_sessions=target_sessions,
             auto_forward_prefix=message.get("auto_forward_prefix", "*"),
             mark_option=message.get("mark_option", "emoji"),
             cmd_enabled=cmd.get("enabled", True),
-            cmd_white_black_list=cmd.get("cmd_white_black_list", "white"),
+            cmd_white_black_list=(cmd.get("cmd_white_black_list") or "white").lower(),
             cmd_list=cmd.get("cmd_list", []),
             bind_enable=cmd.get("bind_enable", True),
             custom_cmd_list=cmd.get("custom_cmd_list", []),
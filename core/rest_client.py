@@ -1,11 +1,14 @@
 """Minecraft 服务器通信的 REST API 客户端"""
 
+import asyncio
+import time
 from typing import Any
 
 import aiohttp
 
 from astrbot.api import logger
 
+from .json_codec import json_dumps, json_loads
 from .models import (
     ApiResponse,
     LogEntry,
@@ -19,11 +22,32 @@ from .models import (
 DEFAULT_REQUEST_TIMEOUT = 30  # 默认请求超时（秒）
 HEALTH_CHECK_TIMEOUT = 5  # 健康检查超时（秒）
 MAX_LOG_LINES = 1000  # 最大日志行数
+STATUS_CACHE_TTL = 5  # 服务器状态缓存有效期（秒）
+INFO_CACHE_TTL = 5  # 服务器信息缓存有效期（秒）
+PLAYERS_CACHE_TTL = 2  # 玩家列表缓存有效期（秒）
+CONNECTION_LIMIT = 4  # 单个服务器的最大并发连接数
+KEEPALIVE_TIMEOUT = 60  # 空闲连接保活时间（秒）
 
 
 class RestClient:
     """与 Minecraft 服务器通信的 REST API 客户端"""
 
+    __slots__ = (
+        "_base_url",
+        "_get_cache",
+        "_headers",
+        "_health_timeout",
+        "_health_url",
+        "_inflight",
+        "_request_timeout",
+        "_session",
+        "_timeout",
+        "host",
+        "port",
+        "server_id",
+        "token",
+    )
+
     def __init__(
         self,
         server_id: str,
@@ -38,21 +62,37 @@ class RestClient:
         self.token = token
         self._request_timeout = request_timeout
         self._session: aiohttp.ClientSession | None = None
+        # 地址、认证头与超时在生命周期内不变，预先构建一次
+        self._base_url = f"http://{host}:{port}/api/v1"
+        self._health_url = f"{self._base_url}/health"
+        self._headers = {
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json",
+        }
+        self._timeout = aiohttp.ClientTimeout(total=request_timeout)
+        self._health_timeout = aiohttp.ClientTimeout(total=HEALTH_CHECK_TIMEOUT)
+        # 成功的 GET 响应缓存: (endpoint, params) -> (monotonic 时间戳, 响应)
+        self._get_cache: dict[tuple, tuple[float, ApiResponse]] = {}
+        # 进行中的 GET 请求，并发的相同请求共享同一次网络调用
+        self._inflight: dict[tuple, asyncio.Task[ApiResponse]] = {}
 
     @property
     def base_url(self) -> str:
-        return f"http://{self.host}:{self.port}/api/v1"
+        return self._base_url
 
     @property
     def headers(self) -> dict[str, str]:
-        return {
-            "Authorization": f"Bearer {self.token}",
-            "Content-Type": "application/json",
-        }
+        return dict(self._headers)
 
     async def _get_session(self) -> aiohttp.ClientSession:
+        # 所有请求共用一个会话，命令之间复用 keep-alive 连接
         if self._session is None or self._session.closed:
-            self._session = aiohttp.ClientSession()
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=CONNECTION_LIMIT, keepalive_timeout=KEEPALIVE_TIMEOUT
+                ),
+                json_serialize=json_dumps,
+            )
         return self._session
 
     async def close(self):
@@ -69,19 +109,19 @@ class RestClient:
         json_data: dict | None = None,
     ) -> ApiResponse:
         """向服务器发送 HTTP 请求"""
-        url = f"{self.base_url}{endpoint}"
+        url = f"{self._base_url}{endpoint}"
 
         try:
             session = await self._get_session()
             async with session.request(
                 method,
                 url,
-                headers=self.headers,
+                headers=self._headers,
                 params=params,
                 json=json_data,
-                timeout=aiohttp.ClientTimeout(total=self._request_timeout),
+                timeout=self._timeout,
             ) as resp:
-                data = await resp.json()
+                data = await resp.json(loads=json_loads)
                 return ApiResponse.from_dict(data)
 
         except aiohttp.ClientConnectorError:
@@ -100,11 +140,40 @@ class RestClient:
     async def _post(self, endpoint: str, json_data: dict | None = None) -> ApiResponse:
         return await self._request("POST", endpoint, json_data=json_data)
 
+    async def _cached_get(
+        self, endpoint: str, params: dict | None = None, max_age: float = 0
+    ) -> ApiResponse:
+        """带短期缓存的 GET 请求
+
+        max_age 秒内成功的响应直接复用；同一请求并发到达时只发送一次。
+        """
+        key = (endpoint, tuple(sorted(params.items())) if params else ())
+        cached = self._get_cache.get(key)
+        if cached and time.monotonic() - cached[0] < max_age:
+            return cached[1]
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._get(endpoint, params=params))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield: 单个调用方被取消时不影响共享同一请求的其他调用方
+        resp = await asyncio.shield(task)
+        if resp.success:
+            self._get_cache[key] = (time.monotonic(), resp)
+        return resp
+
     # 服务器 APIs
 
-    async def get_server_info(self) -> tuple[ServerInfo | None, str]:
-        """获取服务器信息"""
-        resp = await self._get("/server/info")
+    async def get_server_info(
+        self, max_age: float = INFO_CACHE_TTL
+    ) -> tuple[ServerInfo | None, str]:
+        """获取服务器信息
+
+        同一条指令中会多次查询（判断代理模式、构建目标列表、渲染），
+        max_age 秒内的结果直接复用。
+        """
+        resp = await self._cached_get("/server/info", max_age=max_age)
         if resp.success and resp.data:
             info = ServerInfo.from_dict(resp.data)
             if info.is_proxy:
@@ -116,9 +185,14 @@ class RestClient:
             return info, ""
         return None, resp.message
 
-    async def get_server_status(self) -> tuple[ServerStatus | None, str]:
-        """获取服务器状态"""
-        resp = await self._get("/server/status")
+    async def get_server_status(
+        self, max_age: float = STATUS_CACHE_TTL
+    ) -> tuple[ServerStatus | None, str]:
+        """获取服务器状态
+
+        max_age 秒内获取过的状态直接复用，避免短时间内重复请求。
+        """
+        resp = await self._cached_get("/server/status", max_age=max_age)
         if resp.success and resp.data:
             status = ServerStatus.from_dict(resp.data)
             if status.is_proxy:
@@ -133,11 +207,10 @@ class RestClient:
         """检查服务器是否健康（不需要认证）"""
         try:
             session = await self._get_session()
-            url = f"http://{self.host}:{self.port}/api/v1/health"
             async with session.get(
-                url, timeout=aiohttp.ClientTimeout(total=HEALTH_CHECK_TIMEOUT)
+                self._health_url, timeout=self._health_timeout
             ) as resp:
-                data = await resp.json()
+                data = await resp.json(loads=json_loads)
                 return data.get("code") == 0
         except Exception:
             return False
@@ -145,10 +218,15 @@ class RestClient:
     # 玩家 APIs
 
     async def get_players(
-        self, page: int = 1, size: int = 20
+        self, page: int = 1, size: int = 20, max_age: float = PLAYERS_CACHE_TTL
     ) -> tuple[list[PlayerInfo], int, str]:
-        """获取在线玩家列表"""
-        resp = await self._get("/players", params={"page": page, "size": size})
+        """获取在线玩家列表
+
+        max_age 秒内的相同查询直接复用结果。
+        """
+        resp = await self._cached_get(
+            "/players", params={"page": page, "size": size}, max_age=max_age
+        )
         if resp.success and resp.data:
             players = [PlayerInfo.from_dict(p) for p in resp.data.get("players", [])]
             total = resp.data.get("total", resp.data.get("count", len(players)))
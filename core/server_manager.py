@@ -1,24 +1,40 @@
 """Minecraft 服务器连接管理器"""
 
 import asyncio
-from collections.abc import Callable, Coroutine
+from collections.abc import Callable, Coroutine, Iterable
 from typing import Any
 
 from astrbot.api import logger
 
-from .models import MCMessage, ServerConfig, ServerInfo
+from .models import MCMessage, MessageType, ServerConfig, ServerInfo
 from .rest_client import RestClient
 from .ws_client import WebSocketClient
 
+# 消息处理器可同步返回 None 表示无需处理，避免为被丢弃的消息创建协程
+MessageHandler = Callable[
+    [str, ServerConfig, MCMessage], Coroutine[Any, Any, None] | None
+]
+
 
 class ServerConnection:
     """表示与单个 Minecraft 服务器的连接"""
 
+    # 每条消息都会经过连接对象，固定属性布局以加快访问
+    __slots__ = (
+        "_on_connect",
+        "_on_disconnect",
+        "_on_message",
+        "_task",
+        "config",
+        "rest_client",
+        "ws_client",
+    )
+
     def __init__(
         self,
         config: ServerConfig,
-        on_message: Callable[[str, MCMessage], Coroutine[Any, Any, None]] | None = None,
-        on_connect: Callable[[str, ServerInfo], Coroutine[Any, Any, None]]
+        on_message: MessageHandler | None = None,
+        on_connect: Callable[[str, ServerConfig, ServerInfo], Coroutine[Any, Any, None]]
         | None = None,
         on_disconnect: Callable[[str, str], Coroutine[Any, Any, None]] | None = None,
     ):
@@ -36,6 +52,7 @@ class ServerConnection:
             on_message=self._handle_ws_message,
             on_connect=self._handle_connect,
             on_disconnect=self._handle_disconnect,
+            accepted_types=self._accepted_message_types(config),
         )
 
         self.rest_client = RestClient(
@@ -47,6 +64,18 @@ class ServerConnection:
 
         self._task: asyncio.Task | None = None
 
+    @staticmethod
+    def _accepted_message_types(config: ServerConfig) -> set[MessageType]:
+        """根据配置确定需要接收的业务消息类型，其余消息在解析前丢弃"""
+        types: set[MessageType] = set()
+        if config.enable_ai_chat:
+            types.add(MessageType.CHAT_REQUEST)
+        if config.forward_chat_to_astrbot:
+            types.add(MessageType.MESSAGE_FORWARD)
+        if config.forward_join_leave_to_astrbot:
+            types.update((MessageType.PLAYER_JOIN, MessageType.PLAYER_QUIT))
+        return types
+
     @property
     def server_id(self) -> str:
         return self.config.server_id
@@ -59,13 +88,17 @@ class ServerConnection:
     def server_info(self) -> ServerInfo | None:
         return self.ws_client.server_info
 
+    # 回调直接携带本连接持有的配置，处理器无需再按 server_id 查找
     async def _handle_ws_message(self, msg: MCMessage):
         if self._on_message:
-            await self._on_message(self.server_id, msg)
+            # 处理器对无需处理的消息返回 None，此时不产生 await
+            coro = self._on_message(self.config.server_id, self.config, msg)
+            if coro is not None:
+                await coro
 
     async def _handle_connect(self, info: ServerInfo):
         if self._on_connect:
-            await self._on_connect(self.server_id, info)
+            await self._on_connect(self.config.server_id, self.config, info)
 
     async def _handle_disconnect(self, reason: str):
         if self._on_disconnect:
@@ -97,24 +130,21 @@ class ServerManager:
 
     def __init__(self):
         self._servers: dict[str, ServerConnection] = {}
-        self._on_message: (
-            Callable[[str, MCMessage], Coroutine[Any, Any, None]] | None
-        ) = None
+        self._on_message: MessageHandler | None = None
         self._on_connect: (
-            Callable[[str, ServerInfo], Coroutine[Any, Any, None]] | None
+            Callable[[str, ServerConfig, ServerInfo], Coroutine[Any, Any, None]] | None
         ) = None
         self._on_disconnect: Callable[[str, str], Coroutine[Any, Any, None]] | None = (
             None
         )
 
-    def set_message_handler(
-        self, handler: Callable[[str, MCMessage], Coroutine[Any, Any, None]]
-    ):
+    def set_message_handler(self, handler: MessageHandler):
         """设置传入消息的处理器"""
         self._on_message = handler
 
     def set_connect_handler(
-        self, handler: Callable[[str, ServerInfo], Coroutine[Any, Any, None]]
+        self,
+        handler: Callable[[str, ServerConfig, ServerInfo], Coroutine[Any, Any, None]],
     ):
         """设置连接事件的处理器"""
         self._on_connect = handler
@@ -127,19 +157,25 @@ class ServerManager:
 
     def add_server(self, config: ServerConfig) -> bool:
         """添加服务器配置"""
-        if config.server_id in self._servers:
-            logger.warning(f"[ServerManager] 服务器 {config.server_id} 已存在")
-            return False
-
-        connection = ServerConnection(
-            config=config,
-            on_message=self._on_message,
-            on_connect=self._on_connect,
-            on_disconnect=self._on_disconnect,
-        )
-        self._servers[config.server_id] = connection
-        logger.info(f"[ServerManager] 已添加服务器: {config.server_id}")
-        return True
+        return self.add_servers((config,)) == 1
+
+    def add_servers(self, configs: Iterable[ServerConfig]) -> int:
+        """批量添加服务器配置，返回实际添加的数量"""
+        added = []
+        for config in configs:
+            if config.server_id in self._servers:
+                logger.warning(f"[ServerManager] 服务器 {config.server_id} 已存在")
+                continue
+            self._servers[config.server_id] = ServerConnection(
+                config=config,
+                on_message=self._on_message,
+                on_connect=self._on_connect,
+                on_disconnect=self._on_disconnect,
+            )
+            added.append(config.server_id)
+        if added:
+            logger.info(f"[ServerManager] 已添加服务器: {', '.join(added)}")
+        return len(added)
 
     def remove_server(self, server_id: str) -> bool:
         """移除服务器配置"""
@@ -169,9 +205,17 @@ class ServerManager:
                 await server.start()
 
     async def stop_all(self):
-        """停止所有服务器连接"""
-        for server in self._servers.values():
-            await server.stop()
+        """停止所有服务器连接
+
+        各连接的关闭互不依赖，并发执行，总耗时取决于最慢的一个。
+        """
+        servers = list(self._servers.values())
+        results = await asyncio.gather(
+            *(server.stop() for server in servers), return_exceptions=True
+        )
+        for server, result in zip(servers, results):
+            if isinstance(result, Exception):
+                logger.error(f"[MC-{server.server_id}] 停止连接失败: {result}")
 
     async def start_server(self, server_id: str) -> bool:
         """启动特定的服务器连接"""
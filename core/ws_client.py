@@ -1,27 +1,81 @@
 """Minecraft 服务器通信的 WebSocket 客户端"""
 
 import asyncio
+import contextlib
+import random
 import time
 import uuid
-from collections.abc import Callable, Coroutine
+from collections.abc import Callable, Coroutine, Iterable
 from typing import Any
 
 import aiohttp
 
 from astrbot.api import logger
 
+from .json_codec import json_dumps, json_loads
 from .models import MCMessage, MessageType, ServerInfo
 
+# 可选的 simdjson 解析器，可按需读取字段而不物化整个文档
+try:
+    import simdjson
+except ImportError:
+    simdjson = None
+
+# 只需读取 type/id/timestamp 的轻量帧类型
+_LIGHT_FRAME_TYPES = frozenset(
+    {MessageType.HEARTBEAT.value, MessageType.HEARTBEAT_ACK.value}
+)
+
 # 连接常量
 DEFAULT_RECONNECT_DELAY = 1  # 初始重连延迟（秒）
 MAX_RECONNECT_DELAY = 60  # 最大重连延迟（秒）
 DEFAULT_HEARTBEAT_INTERVAL = 30  # 心跳间隔（秒）
 CONNECTION_TIMEOUT = 10  # 连接超时（秒）
+RECEIVE_QUEUE_SIZE = 256  # 接收队列容量（帧）
+YIELD_EVERY_FRAMES = 64  # 连续接收多少帧后主动让出事件循环
+
+# 需要解析的数据帧类型
+_DATA_FRAME_TYPES = frozenset({aiohttp.WSMsgType.TEXT, aiohttp.WSMsgType.BINARY})
+
+# 心跳帧结构固定，预先编码为模板，发送时只填入 id 与时间戳
+_HEARTBEAT_FRAME = (
+    '{"type":"' + MessageType.HEARTBEAT.value + '","id":"%s","timestamp":%d}'
+)
+_HEARTBEAT_ACK_FRAME = (
+    '{"type":"' + MessageType.HEARTBEAT_ACK.value + '","id":%s,"timestamp":%d}'
+)
 
 
 class WebSocketClient:
     """与 Minecraft 服务器通信的 WebSocket 客户端"""
 
+    # 收发路径上频繁访问实例属性，使用 __slots__ 减少属性查找与内存占用
+    __slots__ = (
+        "_connected",
+        "_control_handlers",
+        "_frame_probes",
+        "_frame_probes_bytes",
+        "_heartbeat_interval",
+        "_heartbeat_task",
+        "_max_reconnect_delay",
+        "_reconnect_delay",
+        "_running",
+        "_server_info",
+        "_session",
+        "_session_id",
+        "_sj_parser",
+        "_ws",
+        "_ws_alive",
+        "_ws_url",
+        "host",
+        "on_connect",
+        "on_disconnect",
+        "on_message",
+        "port",
+        "server_id",
+        "token",
+    )
+
     def __init__(
         self,
         server_id: str,
@@ -33,6 +87,7 @@ class WebSocketClient:
         on_disconnect: Callable[[str], Coroutine[Any, Any, None]] | None = None,
         heartbeat_interval: int = DEFAULT_HEARTBEAT_INTERVAL,
         max_reconnect_delay: int = MAX_RECONNECT_DELAY,
+        accepted_types: Iterable[MessageType] | None = None,
     ):
         self.server_id = server_id
         self.host = host
@@ -41,17 +96,40 @@ class WebSocketClient:
         self.on_message = on_message
         self.on_connect = on_connect
         self.on_disconnect = on_disconnect
+        # 认证信息随连接地址携带，生命周期内不变，预先构建一次
+        self._ws_url = f"ws://{host}:{port}/ws?token={token}"
 
         self._ws: aiohttp.ClientWebSocketResponse | None = None
         self._session: aiohttp.ClientSession | None = None
         self._running = False
         self._connected = False
+        # 连接可写标志，由连接/断开路径维护，发送时无需查询 ws.closed
+        self._ws_alive = False
         self._reconnect_delay = DEFAULT_RECONNECT_DELAY
         self._max_reconnect_delay = max_reconnect_delay
         self._heartbeat_interval = heartbeat_interval
         self._heartbeat_task: asyncio.Task | None = None
         self._session_id: str = ""
         self._server_info: ServerInfo | None = None
+        # simdjson 解析器可跨帧复用
+        self._sj_parser = simdjson.Parser() if simdjson else None
+        # 由客户端自身处理的控制消息，其余类型转发给 on_message
+        self._control_handlers: dict[
+            MessageType, Callable[[MCMessage], Coroutine[Any, Any, None]]
+        ] = {
+            MessageType.HEARTBEAT: self._on_heartbeat,
+            MessageType.HEARTBEAT_ACK: self._on_heartbeat_ack,
+            MessageType.DISCONNECT: self._on_disconnect_msg,
+            MessageType.ERROR: self._on_error_msg,
+        }
+        # 指定 accepted_types 时，解析前先按 "TYPE" 子串预筛帧，
+        # 跳过不会被处理的消息；None 表示不过滤
+        self._frame_probes: tuple[str, ...] | None = None
+        self._frame_probes_bytes: tuple[bytes, ...] | None = None
+        if accepted_types is not None:
+            wanted = set(accepted_types) | self._control_handlers.keys()
+            self._frame_probes = tuple(f'"{t.value}"' for t in wanted)
+            self._frame_probes_bytes = tuple(p.encode() for p in self._frame_probes)
 
     @property
     def connected(self) -> bool:
@@ -63,7 +141,7 @@ class WebSocketClient:
 
     @property
     def ws_url(self) -> str:
-        return f"ws://{self.host}:{self.port}/ws?token={self.token}"
+        return self._ws_url
 
     async def connect(self) -> bool:
         """建立 WebSocket 连接"""
@@ -82,47 +160,62 @@ class WebSocketClient:
 
             # 等待 CONNECTION_ACK
             msg = await asyncio.wait_for(self._ws.receive(), timeout=CONNECTION_TIMEOUT)
-            if msg.type == aiohttp.WSMsgType.TEXT:
-                data = msg.json()
-                if data.get("type") == MessageType.CONNECTION_ACK.value:
-                    self._session_id = data.get("data", {}).get("sessionId", "")
-                    server_data = data.get("data", {}).get("serverInfo", {})
-                    self._server_info = ServerInfo.from_dict(server_data)
-                    self._connected = True
-                    self._reconnect_delay = DEFAULT_RECONNECT_DELAY  # 成功后重置
-
-                    logger.info(
-                        f"[MC-{self.server_id}] 已连接到 {self._server_info.name} "
-                        f"({self._server_info.platform} {self._server_info.minecraft_version})"
-                    )
-
-                    if self.on_connect:
-                        await self.on_connect(self._server_info)
-
-                    return True
+            data = json_loads(msg.data) if msg.type == aiohttp.WSMsgType.TEXT else None
+            if not data or data.get("type") != MessageType.CONNECTION_ACK.value:
+                logger.error(f"[MC-{self.server_id}] 接收 CONNECTION_ACK 失败: {msg}")
+                await self._close_ws()
+                return False
 
-            logger.error(f"[MC-{self.server_id}] 接收 CONNECTION_ACK 失败: {msg}")
-            return False
+            self._session_id = data.get("data", {}).get("sessionId", "")
+            server_data = data.get("data", {}).get("serverInfo", {})
+            self._server_info = ServerInfo.from_dict(server_data)
 
         except asyncio.TimeoutError:
             logger.error(f"[MC-{self.server_id}] 连接超时")
+            await self._close_ws()
             return False
         except Exception as e:
             logger.error(f"[MC-{self.server_id}] 连接失败: {e}")
+            await self._close_ws()
             return False
 
+        self._connected = True
+        self._ws_alive = True
+        self._reconnect_delay = DEFAULT_RECONNECT_DELAY  # 成功后重置
+
+        logger.info(
+            f"[MC-{self.server_id}] 已连接到 {self._server_info.name} "
+            f"({self._server_info.platform} {self._server_info.minecraft_version})"
+        )
+
+        # 回调放在握手之外：插件回调出错不应关闭已建立的连接
+        if self.on_connect:
+            try:
+                await self.on_connect(self._server_info)
+            except Exception as e:
+                logger.error(f"[MC-{self.server_id}] 连接回调异常: {e}")
+
+        return True
+
+    async def _close_ws(self):
+        """关闭并释放当前 WebSocket，避免握手失败后重连时泄漏旧连接"""
+        ws, self._ws = self._ws, None
+        if ws and not ws.closed:
+            await ws.close()
+
     async def disconnect(self):
         """关闭 WebSocket 连接"""
         self._running = False
         self._connected = False
+        self._ws_alive = False
 
-        if self._heartbeat_task:
-            self._heartbeat_task.cancel()
-            self._heartbeat_task = None
+        heartbeat_task, self._heartbeat_task = self._heartbeat_task, None
+        if heartbeat_task:
+            heartbeat_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await heartbeat_task
 
-        if self._ws and not self._ws.closed:
-            await self._ws.close()
-            self._ws = None
+        await self._close_ws()
 
         if self._session:
             await self._session.close()
@@ -138,12 +231,12 @@ class WebSocketClient:
             if not self._connected:
                 success = await self.connect()
                 if not success:
-                    # 重连的指数退避
+                    # 重连的指数退避，加入随机抖动避免多个连接同时重连
+                    delay = self._reconnect_delay * random.uniform(0.5, 1.0)
                     logger.info(
-                        f"[MC-{self.server_id}] "
-                        f"将在 {self._reconnect_delay}秒后尝试重连..."
+                        f"[MC-{self.server_id}] 将在 {delay:.1f}秒后尝试重连..."
                     )
-                    await asyncio.sleep(self._reconnect_delay)
+                    await asyncio.sleep(delay)
                     self._reconnect_delay = min(
                         self._reconnect_delay * 2, self._max_reconnect_delay
                     )
@@ -159,6 +252,7 @@ class WebSocketClient:
                 logger.error(f"[MC-{self.server_id}] 接收循环异常: {e}")
             finally:
                 self._connected = False
+                self._ws_alive = False
                 if self._heartbeat_task:
                     self._heartbeat_task.cancel()
 
@@ -170,22 +264,77 @@ class WebSocketClient:
         if not self._ws:
             return
 
-        async for msg in self._ws:
-            if msg.type == aiohttp.WSMsgType.TEXT:
-                try:
-                    data = msg.json()
-                    mc_msg = MCMessage.from_dict(data)
-                    await self._handle_message(mc_msg)
-                except Exception as e:
-                    logger.error(f"[MC-{self.server_id}] 解析消息异常: {e}")
+        # 接收与处理解耦：接收循环只负责入队，由 worker 解析和分发，
+        # 避免处理较慢的消息阻塞 socket 读取；队列满时等待以形成背压
+        inq: asyncio.Queue[str | bytes] = asyncio.Queue(maxsize=RECEIVE_QUEUE_SIZE)
+        worker = asyncio.create_task(self._consume(inq))
+        frame_count = 0
+        try:
+            async for msg in self._ws:
+                # 缓冲区有数据时读取不会挂起，消息洪泛时定期让出以免饿死其他任务
+                frame_count += 1
+                if frame_count % YIELD_EVERY_FRAMES == 0:
+                    await asyncio.sleep(0)
+
+                # 二进制帧按 UTF-8 JSON 处理，直接交给解析器，无需解码为 str
+                if msg.type in _DATA_FRAME_TYPES:
+                    if not self._wants_frame(msg.data):
+                        continue
+                    try:
+                        inq.put_nowait(msg.data)
+                    except asyncio.QueueFull:
+                        await inq.put(msg.data)
+
+                elif msg.type == aiohttp.WSMsgType.ERROR:
+                    logger.error(f"[MC-{self.server_id}] WebSocket 错误: {msg.data}")
+                    break
+
+                elif msg.type == aiohttp.WSMsgType.CLOSED:
+                    logger.info(f"[MC-{self.server_id}] WebSocket 已关闭")
+                    break
+
+            # 连接已关闭，处理完已接收的帧（期间的发送直接跳过）
+            self._ws_alive = False
+            await inq.join()
+        finally:
+            worker.cancel()
+
+    async def _consume(self, inq: asyncio.Queue[str | bytes]):
+        """从接收队列取出数据帧并处理"""
+        while True:
+            raw = await inq.get()
+            try:
+                mc_msg = self._decode_frame(raw)
+                await self._handle_message(mc_msg)
+            except Exception as e:
+                logger.error(f"[MC-{self.server_id}] 解析消息异常: {e}")
+            finally:
+                inq.task_done()
+
+    def _wants_frame(self, raw: str | bytes) -> bool:
+        """粗略判断帧是否包含需要处理的消息类型，可能误判为需要但不会漏判"""
+        probes = (
+            self._frame_probes_bytes if isinstance(raw, bytes) else self._frame_probes
+        )
+        return probes is None or any(p in raw for p in probes)
 
-            elif msg.type == aiohttp.WSMsgType.ERROR:
-                logger.error(f"[MC-{self.server_id}] WebSocket 错误: {msg.data}")
-                break
+    def _decode_frame(self, raw: str | bytes) -> MCMessage:
+        """将数据帧解析为 MCMessage
 
-            elif msg.type == aiohttp.WSMsgType.CLOSED:
-                logger.info(f"[MC-{self.server_id}] WebSocket 已关闭")
-                break
+        有 simdjson 时，心跳类帧只读取需要的字段，其余帧再转换为 dict。
+        """
+        if self._sj_parser is None:
+            return MCMessage.from_dict(json_loads(raw))
+
+        doc = self._sj_parser.parse(raw if isinstance(raw, bytes) else raw.encode())
+        msg_type = doc.get("type")
+        if msg_type in _LIGHT_FRAME_TYPES:
+            return MCMessage(
+                type=MessageType(msg_type),
+                id=doc.get("id", ""),
+                timestamp=doc.get("timestamp", 0),
+            )
+        return MCMessage.from_dict(doc.as_dict())
 
     async def _handle_message(self, msg: MCMessage):
         """
@@ -198,67 +347,76 @@ class WebSocketClient:
             处理不同类型的消息，包括心跳、断开连接、错误消息，
             并将其他类型转发给注册的处理器。
         """
-        if msg.type == MessageType.HEARTBEAT:
-            # 响应服务器心跳
-            await self._send_heartbeat_ack(msg.id)
-
-        elif msg.type == MessageType.HEARTBEAT_ACK:
-            # 心跳已确认
-            pass
-
-        elif msg.type == MessageType.DISCONNECT:
-            reason = msg.payload.get("reason", "未知")
-            message = msg.payload.get("message", "")
-            logger.warning(
-                f"[MC-{self.server_id}] 服务器断开连接: {reason} - {message}"
-            )
-            self._connected = False
+        handler = self._control_handlers.get(msg.type)
+        if handler:
+            await handler(msg)
+            return
+
+        # 转发到消息处理器
+        if self.on_message:
+            try:
+                await self.on_message(msg)
+            except Exception as e:
+                logger.error(f"[MC-{self.server_id}] 消息处理器异常: {e}")
+
+    async def _on_heartbeat(self, msg: MCMessage):
+        """响应服务器心跳"""
+        await self._send_heartbeat_ack(msg.id)
+
+    async def _on_heartbeat_ack(self, msg: MCMessage):
+        """心跳已确认"""
 
-        elif msg.type == MessageType.ERROR:
-            code = msg.payload.get("code", 0)
-            error_msg = msg.payload.get("message", "")
-            logger.error(f"[MC-{self.server_id}] 错误 {code}: {error_msg}")
+    async def _on_disconnect_msg(self, msg: MCMessage):
+        """处理服务器主动断开"""
+        reason = msg.payload.get("reason", "未知")
+        message = msg.payload.get("message", "")
+        logger.warning(f"[MC-{self.server_id}] 服务器断开连接: {reason} - {message}")
+        self._connected = False
 
-        else:
-            # 转发到消息处理器
-            if self.on_message:
-                try:
-                    await self.on_message(msg)
-                except Exception as e:
-                    logger.error(f"[MC-{self.server_id}] 消息处理器异常: {e}")
+    async def _on_error_msg(self, msg: MCMessage):
+        """记录服务器错误消息"""
+        code = msg.payload.get("code", 0)
+        error_msg = msg.payload.get("message", "")
+        logger.error(f"[MC-{self.server_id}] 错误 {code}: {error_msg}")
 
     async def _heartbeat_loop(self):
-        """定期发送心跳。"""
+        """定期发送心跳。
+
+        按单调时钟上的截止时间等待，发送耗时不会累积为间隔漂移。
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
         while self._connected and self._running:
-            await asyncio.sleep(self._heartbeat_interval)
+            # 落后时从当前时间重新计时，不补发错过的心跳
+            deadline = max(deadline + self._heartbeat_interval, loop.time())
+            await asyncio.sleep(deadline - loop.time())
             if self._connected:
                 await self._send_heartbeat()
 
     async def _send_heartbeat(self):
         """发送心跳消息"""
-        msg = {
-            "type": MessageType.HEARTBEAT.value,
-            "id": str(uuid.uuid4()),
-            "timestamp": int(time.time() * 1000),
-        }
-        await self._send(msg)
+        # uuid 字符串无需转义，直接填入预编码模板
+        await self._send_text(
+            _HEARTBEAT_FRAME % (uuid.uuid4(), int(time.time() * 1000))
+        )
 
     async def _send_heartbeat_ack(self, msg_id: str):
         """发送心跳确认"""
-        msg = {
-            "type": MessageType.HEARTBEAT_ACK.value,
-            "id": msg_id,
-            "timestamp": int(time.time() * 1000),
-        }
-        await self._send(msg)
+        await self._send_text(
+            _HEARTBEAT_ACK_FRAME % (json_dumps(msg_id), int(time.time() * 1000))
+        )
 
     async def _send(self, data: dict) -> bool:
         """通过 WebSocket 发送 JSON 数据"""
-        if not self._ws or self._ws.closed:
+        return await self._send_text(json_dumps(data))
+
+    async def _send_text(self, text: str) -> bool:
+        """通过 WebSocket 发送已编码的文本帧"""
+        if not self._ws_alive:
             return False
 
         try:
-            await self._ws.send_json(data)
+            await self._ws.send_str(text)
             return True
         except Exception as e:
             logger.error(f"[MC-{self.server_id}] 发送错误: {e}")
@@ -16,6 +16,12 @@ if TYPE_CHECKING:
     from ..services.renderer import InfoRenderer
 
 
+# 命令模板中的占位符: {name} 或 <&name&>
+_TEMPLATE_PLACEHOLDER_RE = re.compile(r"\{(\w+)\}|<&(\w+)&>")
+# 消息中的首个词
+_FIRST_TOKEN_RE = re.compile(r"\s*(\S+)")
+
+
 class CustomCommandParser:
     """自定义命令映射解析器"""
 
@@ -27,13 +33,28 @@ class CustomCommandParser:
 
         格式: "trigger <&param&><<>>actual_command {param} {sender}"
         """
-        self.mappings: list[dict[str, object]] = []
+        self.mappings: list[dict[str, Any]] = []
         for mapping in mappings:
             parsed = self._parse_mapping(mapping)
             if parsed:
                 self.mappings.append(parsed)
 
-    def _parse_mapping(self, mapping: str) -> dict[str, object] | None:
+        # 小写触发词集合，用于按首个词预筛选；
+        # 触发词含占位符或正则语法时无法预筛选，置为 None
+        names = [str(m["trigger_name"]).lower() for m in self.mappings]
+        self.trigger_names: frozenset[str] | None = (
+            frozenset(names) if all(n and re.escape(n) == n for n in names) else None
+        )
+        # 触发器最多需要的词数（触发词 + 参数）
+        self._max_token_count = max(
+            (1 + len(m["param_names"]) for m in self.mappings), default=1
+        )
+
+    def may_match(self, first_token: str) -> bool:
+        """根据消息首个词（小写）判断是否可能命中任一映射"""
+        return self.trigger_names is None or first_token in self.trigger_names
+
+    def _parse_mapping(self, mapping: str) -> dict[str, Any] | None:
         """解析映射字符串
 
         返回:
@@ -56,15 +77,39 @@ class CustomCommandParser:
         for param in param_names:
             trigger_regex = trigger_regex.replace(f"<&{param}&>", f"(?P<{param}>\\S+)")
 
-        trigger_name = trigger_part.split()[0] if trigger_part else ""
+        try:
+            trigger_pattern = re.compile(f"^{trigger_regex}$", re.IGNORECASE)
+        except re.error as e:
+            logger.warning(
+                f"[CommandHandler] 无效的自定义指令触发器 {trigger_part}: {e}"
+            )
+            return None
+
+        trigger_name = trigger_part.split(maxsplit=1)[0] if trigger_part else ""
         return {
             "trigger_part": trigger_part,
             "trigger_name": trigger_name,
             "trigger_regex": trigger_regex,
+            "trigger_pattern": trigger_pattern,
             "param_names": param_names,
             "command_template": command_part,
+            "command_segments": self._split_template(command_part),
         }
 
+    @staticmethod
+    def _split_template(template: str) -> list[tuple[str | None, str]]:
+        """将命令模板预先拆分为 (参数名或 None, 原文) 片段列表"""
+        segments: list[tuple[str | None, str]] = []
+        pos = 0
+        for m in _TEMPLATE_PLACEHOLDER_RE.finditer(template):
+            if m.start() > pos:
+                segments.append((None, template[pos : m.start()]))
+            segments.append((m.group(1) or m.group(2), m.group(0)))
+            pos = m.end()
+        if pos < len(template):
+            segments.append((None, template[pos:]))
+        return segments
+
     def match(
         self, text: str, sender_mc_name: str | None = None
     ) -> tuple[str, dict] | None:
@@ -74,19 +119,17 @@ class CustomCommandParser:
             tuple: (actual_command, matched_params) 或 None
         """
         for mapping in self.mappings:
-            trigger_regex = mapping["trigger_regex"]
-            command_template = mapping["command_template"]
-            match = re.match(f"^{trigger_regex}$", text, re.IGNORECASE)
+            match = mapping["trigger_pattern"].match(text)
             if match:
                 params = match.groupdict()
                 # 添加发送者参数
                 params["sender"] = sender_mc_name or ""
 
-                # 构建实际命令
-                command = command_template
-                for key, value in params.items():
-                    command = command.replace(f"{{{key}}}", value)
-                    command = command.replace(f"<&{key}&>", value)
+                # 按预拆分的模板片段构建实际命令，未知占位符保持原样
+                command = "".join(
+                    params.get(name, raw) if name else raw
+                    for name, raw in mapping["command_segments"]
+                )
 
                 return command, params
 
@@ -94,8 +137,9 @@ class CustomCommandParser:
 
     def get_missing_usage(self, text: str) -> str | None:
         """If text looks like a custom command but misses params, return usage."""
-        tokens = re.split(r"\s+", text.strip())
-        if not tokens or not tokens[0]:
+        # 只需切分到最长触发器所需的词数，剩余部分无需继续拆分
+        tokens = text.split(maxsplit=self._max_token_count)
+        if not tokens:
             return None
 
         first_token = tokens[0].lower()
@@ -111,7 +155,7 @@ class CustomCommandParser:
         return None
 
 
-@dataclass
+@dataclass(slots=True)
 class CmdTarget:
     """A selectable command target (proxy itself or a backend server)"""
 
@@ -120,7 +164,7 @@ class CmdTarget:
     target_server: str | None = None  # None = execute on proxy itself
 
 
-@dataclass
+@dataclass(slots=True)
 class PendingAction:
     """A pending action waiting for the user to select a number"""
 
@@ -133,8 +177,29 @@ class PendingAction:
     timestamp: float = 0.0
 
 
+HELP_TEXT = """📖 Minecraft 适配器指令帮助
+
+基础指令:
+    /mc help - 显示此帮助信息
+    /mc status - 查看服务器状态
+    /mc list - 查看在线玩家列表
+    /mc player <玩家ID> - 查看玩家详细信息
+
+远程指令:
+    /mc cmd <指令> - 远程执行服务器指令
+
+绑定功能:
+    /mc bind <游戏ID> - 绑定你的游戏ID
+    /mc unbind - 解除绑定
+
+多服务器:
+    status/list/player 会自动输出所有关联服务器结果
+    cmd 在多目标下仍需编号选择"""
+
 # Pending actions expire after 60 seconds
 PENDING_ACTION_TIMEOUT = 60
+# 编号选择允许的最大位数
+MAX_SELECTION_DIGITS = 4
 
 
 class CommandHandler:
@@ -152,12 +217,34 @@ class CommandHandler:
         self.renderer = renderer
         self.get_server_config = get_server_config
         self._custom_parsers: dict[str, CustomCommandParser] = {}
+        # Session UMO -> server IDs with custom commands enabled for it
+        self._custom_cmd_sessions: dict[str, list[str]] = {}
         # Pending actions per session UMO
         self._pending_actions: dict[str, PendingAction] = {}
+        # 帮助文本缓存，注册自定义命令时失效
+        self._help_text: str | None = None
+        # Pending action name -> executor(event, server, args)
+        self._server_actions = {
+            "status": lambda event, server, args: self._do_status(event, server),
+            "list": lambda event, server, args: self._do_list(event, server),
+            "player": lambda event, server, args: self._do_player(
+                event, server, args.get("player_id", "")
+            ),
+            "bind": lambda event, server, args: self._do_bind(
+                event, server, args.get("player_id", "")
+            ),
+        }
 
     def register_custom_commands(self, server_id: str, mappings: list[str]):
         """为服务器注册自定义命令"""
         self._custom_parsers[server_id] = CustomCommandParser(mappings)
+        self._help_text = None
+        config = self.get_server_config(server_id)
+        if config and config.cmd_enabled:
+            for umo in config.target_sessions:
+                server_ids = self._custom_cmd_sessions.setdefault(umo, [])
+                if server_id not in server_ids:
+                    server_ids.append(server_id)
         logger.info(
             f"[CommandHandler] 已为服务器 {server_id} 注册了 {len(mappings)} 个自定义命令"
         )
@@ -171,25 +258,39 @@ class CommandHandler:
         流程: 参数解析/匹配 → 收集所有匹配的服务器目标 → 目标选择 → 执行
         (跳过黑白名单——管理员配置的自定义指令是受信任的)
         """
-        message_str = event.message_str.strip()
-        if not message_str:
+        if not self._custom_parsers:
             return
 
-        umo = event.unified_msg_origin
+        # 当前会话没有启用自定义指令的服务器时直接返回
+        server_ids = self._custom_cmd_sessions.get(event.unified_msg_origin)
+        if not server_ids:
+            return
+
+        # 先用首个词筛选可能命中的服务器，未命中时无需处理整条消息
+        head = _FIRST_TOKEN_RE.match(event.message_str)
+        if not head:
+            return
+        first_token = head.group(1).lower()
+        server_ids = [
+            sid
+            for sid in server_ids
+            if self._custom_parsers[sid].may_match(first_token)
+        ]
+        if not server_ids:
+            return
+
+        message_str = event.message_str.strip()
 
         # Collect all matching servers and their resolved commands
         all_targets: list[CmdTarget] = []
         matched_command: str | None = None
         first_missing_usage: str | None = None
 
-        for server_id, parser in self._custom_parsers.items():
+        for server_id in server_ids:
+            parser = self._custom_parsers[server_id]
             config = self.get_server_config(server_id)
             if not config:
                 continue
-            if not config.target_sessions or umo not in config.target_sessions:
-                continue
-            if not config.cmd_enabled:
-                continue
 
             # Check missing usage (show hint from first match)
             usage = parser.get_missing_usage(message_str)
@@ -244,28 +345,33 @@ class CommandHandler:
     async def dispatch_number_selection(self, event: AstrMessageEvent):
         """Dispatch a number selection to the pending action."""
         umo = event.unified_msg_origin
-        pending = self._pending_actions.pop(umo, None)
+        pending = self._pending_actions.get(umo)
         if not pending:
             return
 
         text = event.message_str.strip()
-        if not text.isdigit():
-            yield event.plain_result("❌ 请发送有效的数字编号")
-            self._pending_actions[umo] = pending
+        # 编号最多几位数，超长输入直接视为无效，避免大整数解析开销
+        try:
+            idx = int(text) if len(text) <= MAX_SELECTION_DIGITS else -1
+        except ValueError:
+            idx = -1
+
+        choice_count = len(pending.cmd_targets or pending.servers)
+        if not 1 <= idx <= choice_count:
+            if pending.cmd_targets:
+                choices = self._format_target_choices(pending.cmd_targets)
+            else:
+                choices = self._format_server_choices(pending.servers)
+            yield event.plain_result(f"❌ 编号无效，请从以下列表中选择:\n{choices}")
             return
 
-        idx = int(text)
+        # 编号有效，消费待选操作；无效输入时保留，允许用户重新选择
+        del self._pending_actions[umo]
         action = pending.action
         args = pending.args
 
         if pending.cmd_targets:
             # Unified cmd target selection (proxy + backends)
-            if idx < 1 or idx > len(pending.cmd_targets):
-                choices = self._format_target_choices(pending.cmd_targets)
-                yield event.plain_result(f"❌ 编号无效，请从以下列表中选择:\n{choices}")
-                self._pending_actions[umo] = pending
-                return
-
             target = pending.cmd_targets[idx - 1]
             server = target.server
             target_server = target.target_server
@@ -284,12 +390,6 @@ class CommandHandler:
                 yield result
         else:
             # Server selection (multi-server mode) for non-cmd actions
-            if idx < 1 or idx > len(pending.servers):
-                choices = self._format_server_choices(pending.servers)
-                yield event.plain_result(f"❌ 编号无效，请从以下列表中选择:\n{choices}")
-                self._pending_actions[umo] = pending
-                return
-
             server = pending.servers[idx - 1]
 
             async for result in self._dispatch_server_action(
@@ -299,34 +399,17 @@ class CommandHandler:
 
     async def handle_help(self, event: AstrMessageEvent):
         """显示帮助信息"""
-        help_text = """📖 Minecraft 适配器指令帮助
-
-基础指令:
-    /mc help - 显示此帮助信息
-    /mc status - 查看服务器状态
-    /mc list - 查看在线玩家列表
-    /mc player <玩家ID> - 查看玩家详细信息
-
-远程指令:
-    /mc cmd <指令> - 远程执行服务器指令
-
-绑定功能:
-    /mc bind <游戏ID> - 绑定你的游戏ID
-    /mc unbind - 解除绑定
-
-多服务器:
-    status/list/player 会自动输出所有关联服务器结果
-    cmd 在多目标下仍需编号选择"""
-
-        # 收集自定义指令列表
-        custom_cmds = self._get_custom_command_triggers()
-        if custom_cmds:
-            help_text += "\n\n自定义指令:\n"
-            for trigger in custom_cmds:
-                help_text += f"  {trigger}\n"
-            help_text = help_text.rstrip("\n")
+        if self._help_text is None:
+            help_text = HELP_TEXT
+            # 收集自定义指令列表
+            custom_cmds = self._get_custom_command_triggers()
+            if custom_cmds:
+                help_text += "\n\n自定义指令:\n" + "\n".join(
+                    f"  {trigger}" for trigger in custom_cmds
+                )
+            self._help_text = help_text
 
-        yield event.plain_result(help_text)
+        yield event.plain_result(self._help_text)
 
     async def handle_status(self, event: AstrMessageEvent):
         """显示服务器状态"""
@@ -620,26 +703,12 @@ class CommandHandler:
         self, event: AstrMessageEvent, action: str, server, args: dict
     ):
         """Dispatch non-cmd pending actions to concrete executors."""
-        if action == "status":
-            async for result in self._do_status(event, server):
-                yield result
+        executor = self._server_actions.get(action)
+        if executor is None:
             return
 
-        if action == "list":
-            async for result in self._do_list(event, server):
-                yield result
-            return
-
-        if action == "player":
-            async for result in self._do_player(
-                event, server, args.get("player_id", "")
-            ):
-                yield result
-            return
-
-        if action == "bind":
-            async for result in self._do_bind(event, server, args.get("player_id", "")):
-                yield result
+        async for result in executor(event, server, args):
+            yield result
 
     def _is_cmd_allowed_on_server(self, command: str, server) -> tuple[bool, str]:
         """Check cmd switch + whitelist/blacklist against the target server config."""
@@ -1021,21 +1090,24 @@ class CommandHandler:
 
     def _check_command_allowed(self, command: str, config) -> bool:
         """检查命令是否在白名单/黑名单中允许"""
-        parts = command.split()
+        # 只取第一个词作为指令名（maxsplit=1 避免切分整条指令）；
+        # 按任意空白切分（含制表符、换行、全角空格），与名单匹配保持一致
+        parts = command.split(None, 1)
         if not parts:
             return False
         cmd_name = parts[0].lower()
 
-        cmd_list = [c.lower() for c in config.cmd_list]
-        list_mode = (config.cmd_white_black_list or "white").lower()
+        cmd_names = config.cmd_name_set
+        # 名单模式在加载配置时已规范化为小写
+        list_mode = config.cmd_white_black_list
 
         if list_mode == "none":
             return True
 
         if list_mode == "white":
-            return cmd_name in cmd_list
+            return cmd_name in cmd_names
 
         if list_mode == "black":
-            return cmd_name not in cmd_list
+            return cmd_name not in cmd_names
 
-        return cmd_name in cmd_list
+        return cmd_name in cmd_names
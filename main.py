@@ -5,8 +5,13 @@
 """
 
 import asyncio
+import logging
+from collections.abc import AsyncIterator, Callable, Coroutine
 from contextlib import suppress
+from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
+from typing import Any
 
 from astrbot.api import logger
 from astrbot.api.event import AstrMessageEvent, filter
@@ -22,6 +27,30 @@ from .services.binding import BindingService
 from .services.message_bridge import MessageBridge
 from .services.renderer import InfoRenderer
 
+# 每条 MC 消息都会调用的日志方法，预先绑定以省去属性查找
+_log_debug = logger.debug
+_log_info = logger.info
+_log_enabled_for = logger.isEnabledFor
+
+# mc 命令组分发到 CommandHandler 的方法名
+_COMMAND_METHODS = (
+    "handle_help",
+    "handle_status",
+    "handle_list",
+    "handle_player",
+    "handle_cmd",
+    "handle_bind",
+    "handle_unbind",
+)
+
+
+@dataclass(slots=True)
+class _AdapterEntry:
+    """单个服务器的平台适配器及其运行任务"""
+
+    adapter: MCPlatformAdapter
+    task: asyncio.Task | None = None
+
 
 @register(
     "astrbot_plugin_minecraft_adapter",
@@ -51,15 +80,29 @@ class MinecraftAdapterPlugin(Star):
         self.binding_service = BindingService(plugin_data_path)
         self.message_bridge = MessageBridge(context, self.server_manager)
 
+        # 消息类型 -> 绑定方法，构建一次，每条消息只做一次字典查找；
+        # 转发类消息直接交给消息桥接，不经过中间包装
+        forward = self.message_bridge.handle_mc_message
+        self._message_handlers: dict[MessageType, Callable[..., Coroutine]] = {
+            MessageType.CHAT_REQUEST: self._handle_chat_request,
+            MessageType.MESSAGE_FORWARD: forward,
+            MessageType.PLAYER_JOIN: forward,
+            MessageType.PLAYER_QUIT: forward,
+        }
+
         # 服务器配置缓存
         self._server_configs: dict[str, ServerConfig] = {}
 
         # 平台适配器
-        self._adapters: dict[str, MCPlatformAdapter] = {}
-        self._adapter_tasks: dict[str, asyncio.Task] = {}
+        # 适配器与其任务合并为一条记录，连接/断开时只操作一个字典
+        self._adapters: dict[str, _AdapterEntry] = {}
+        self._event_queue: asyncio.Queue | None = None
 
         # 命令处理器
         self.command_handler: CommandHandler | None = None
+        self._cmd_methods: dict[str, Callable[..., AsyncIterator]] = {}
+        # 没有任何自定义指令时，on_message 跳过匹配步骤
+        self._has_custom_commands = False
 
         # 设置消息处理器
         self.server_manager.set_message_handler(self._on_server_message)
@@ -75,13 +118,15 @@ class MinecraftAdapterPlugin(Star):
     def _schedule_task(self, coro, task_name: str) -> asyncio.Task | None:
         """创建后台任务并统一处理异常，避免未捕获异常导致静默失败。"""
         try:
-            task = asyncio.create_task(coro)
+            # 任务命名后可在 asyncio 调试输出和 all_tasks() 中直接识别
+            task = asyncio.create_task(coro, name=f"mc_adapter:{task_name}")
         except RuntimeError as exc:
             coro.close()
             logger.error(f"[MC Adapter] 无法启动后台任务 {task_name}: {exc}")
             return None
 
-        task.add_done_callback(lambda t: self._on_task_done(task_name, t))
+        # partial 不形成闭包单元，回调执行后即随任务一同释放
+        task.add_done_callback(partial(self._on_task_done, task_name))
         return task
 
     def _on_task_done(self, task_name: str, task: asyncio.Task):
@@ -105,6 +150,9 @@ class MinecraftAdapterPlugin(Star):
             logger.warning("[MC Adapter] 未配置任何服务器")
             return
 
+        any_text2image = False
+        # 解析时顺带收集自定义指令，创建命令处理器后一次注册
+        custom_cmds: dict[str, list] = {}
         for server_data in mc_servers:
             if not server_data.get("enabled", True):
                 continue
@@ -115,18 +163,23 @@ class MinecraftAdapterPlugin(Star):
                 continue
 
             self._server_configs[config.server_id] = config
+            any_text2image = any_text2image or config.text2image
+            if config.custom_cmd_list:
+                custom_cmds[config.server_id] = config.custom_cmd_list
+            else:
+                # 同一 ID 重复配置时以最后一份为准
+                custom_cmds.pop(config.server_id, None)
 
-            # 将服务器添加到管理器
-            self.server_manager.add_server(config)
-
-            # 注册到消息桥接
-            self.message_bridge.register_server(config)
+        # 解析完成后批量注册到管理器与消息桥接，
+        # 同一 ID 重复配置时各处使用同一份（最后一份）配置
+        configs = self._server_configs.values()
+        self.server_manager.add_servers(configs)
+        self.message_bridge.register_servers(configs)
 
-            logger.info(f"[MC Adapter] 已配置服务器: {config.server_id}")
+        if self._server_configs:
+            logger.info(f"[MC Adapter] 已配置服务器: {', '.join(self._server_configs)}")
 
-        # 初始化渲染器
-        # 检查是否有任何服务器启用了 text2image
-        any_text2image = any(c.text2image for c in self._server_configs.values())
+        # 初始化渲染器（解析配置时已记录是否有服务器启用了 text2image）
         renderer = InfoRenderer(
             text2image_enabled=any_text2image,
             cache_dir=self._plugin_data_path / "renderer_cache",
@@ -137,15 +190,18 @@ class MinecraftAdapterPlugin(Star):
             server_manager=self.server_manager,
             binding_service=self.binding_service,
             renderer=renderer,
-            get_server_config=lambda sid: self._server_configs.get(sid),
+            get_server_config=self._server_configs.get,
         )
+        # 命令方法固定，预先绑定一次，分发时直接查表
+        self._cmd_methods = {
+            name: getattr(self.command_handler, name) for name in _COMMAND_METHODS
+        }
 
         # 为每个服务器注册自定义命令
-        for server_id, config in self._server_configs.items():
-            if config.custom_cmd_list:
-                self.command_handler.register_custom_commands(
-                    server_id, config.custom_cmd_list
-                )
+        register_custom_commands = self.command_handler.register_custom_commands
+        for server_id, cmd_list in custom_cmds.items():
+            register_custom_commands(server_id, cmd_list)
+        self._has_custom_commands = bool(custom_cmds)
 
         # 启动所有服务器
         await self.server_manager.start_all()
@@ -153,49 +209,50 @@ class MinecraftAdapterPlugin(Star):
         logger.info(
             f"[MC Adapter] 插件已初始化，配置了 {len(self._server_configs)} 个服务器"
         )
+        # 事件循环由 AstrBot 管理，插件不自行替换；记录实际类型便于确认 uvloop 是否生效
+        loop = asyncio.get_running_loop()
+        logger.debug(
+            f"[MC Adapter] 事件循环: {type(loop).__module__}.{type(loop).__name__}"
+        )
 
-    async def _on_server_message(self, server_id: str, msg: MCMessage):
-        """处理来自 MC 服务器的消息"""
-        config = self._server_configs.get(server_id)
-        if not config:
-            return
+    def _on_server_message(
+        self, server_id: str, config: ServerConfig, msg: MCMessage
+    ) -> Coroutine[Any, Any, None] | None:
+        """处理来自 MC 服务器的消息
 
-        logger.debug(f"[MC-{server_id}] 收到消息类型: {msg.type}")
+        同步路由：没有对应处理函数的消息直接返回 None，不创建协程对象；
+        否则返回处理协程，由调用方 await。
+        """
+        # 每条消息都会经过此处，使用惰性格式化，未开启 DEBUG 时不构造字符串
+        _log_debug("[MC-%s] 收到消息类型: %s", server_id, msg.type)
 
-        if msg.type == MessageType.CHAT_REQUEST:
+        handler = self._message_handlers.get(msg.type)
+        if handler is None:
+            return None
+        return handler(server_id, msg)
+
+    async def _handle_chat_request(self, server_id: str, msg: MCMessage):
+        """AI 聊天请求 - 转发到平台适配器"""
+        # 日志级别高于 INFO 时跳过来源提取与字符串拼接
+        if _log_enabled_for(logging.INFO):
             payload = msg.payload or {}
-            chat_mode = payload.get("chatMode", "GROUP")
-            content = payload.get("content", "")
-            source_server = (
-                msg.source.server_name if msg.source and msg.source.server_name else ""
-            )
-            source_player = (
-                msg.source.player_name if msg.source and msg.source.player_name else ""
+            source = msg.source
+            _log_info(
+                "[MC-%s] 收到AI聊天消息: %s/%s -> %s [%s]",
+                server_id,
+                (source.server_name if source else "") or server_id,
+                source.player_name if source else "",
+                payload.get("content", ""),
+                payload.get("chatMode", "GROUP"),
             )
-            source_label = source_server or server_id
-            logger.info(
-                f"[MC-{server_id}] 收到AI聊天消息: {source_label}"
-                f"/{source_player} -> {content} [{chat_mode}]"
-            )
-            # AI 聊天请求 - 转发到平台适配器
-            adapter = self._adapters.get(server_id)
-            if adapter:
-                await adapter.handle_chat_request(msg)
-
-        elif msg.type in (
-            MessageType.MESSAGE_FORWARD,
-            MessageType.PLAYER_JOIN,
-            MessageType.PLAYER_QUIT,
-        ):
-            # 转发到外部会话
-            await self.message_bridge.handle_mc_message(server_id, msg)
+        entry = self._adapters.get(server_id)
+        if entry:
+            await entry.adapter.handle_chat_request(msg)
 
-    async def _on_server_connect(self, server_id: str, info: ServerInfo):
+    async def _on_server_connect(
+        self, server_id: str, config: ServerConfig, info: ServerInfo
+    ):
         """处理服务器连接"""
-        config = self._server_configs.get(server_id)
-        if not config:
-            return
-
         logger.info(
             f"[MC-{server_id}] 已连接到 {info.name} "
             f"({info.platform} {info.minecraft_version})"
@@ -206,45 +263,52 @@ class MinecraftAdapterPlugin(Star):
             server = self.server_manager.get_server(server_id)
             if server:
                 # 防止重复连接时遗留旧适配器/任务
-                old_adapter = self._adapters.pop(server_id, None)
-                if old_adapter:
-                    await old_adapter.stop()
-
-                old_task = self._adapter_tasks.pop(server_id, None)
-                if old_task and not old_task.done():
-                    old_task.cancel()
-
-                event_queue = (
-                    self.context.platform_manager.event_queue
-                    if self.context and self.context.platform_manager
-                    else asyncio.Queue()
-                )
+                await self._stop_adapter(server_id)
+
+                event_queue = self._get_event_queue()
+                if event_queue is None:
+                    # 没有事件队列时提交的事件无人消费，不创建适配器
+                    logger.warning(
+                        f"[MC-{server_id}] AstrBot 平台管理器未就绪，跳过注册平台适配器"
+                    )
+                    return
+
                 adapter = MCPlatformAdapter(
                     server_config=config,
                     server_connection=server,
                     event_queue=event_queue,
                 )
-                self._adapters[server_id] = adapter
-
                 # 启动适配器（非阻塞）
-                task = self._schedule_task(adapter.run(), f"adapter:{server_id}")
-                if task:
-                    self._adapter_tasks[server_id] = task
+                self._adapters[server_id] = _AdapterEntry(
+                    adapter,
+                    self._schedule_task(adapter.run(), f"adapter:{server_id}"),
+                )
 
                 logger.info(f"[MC-{server_id}] 平台适配器已注册")
 
+    def _get_event_queue(self) -> asyncio.Queue | None:
+        """获取 AstrBot 事件队列，解析成功后缓存，重连时不再逐级查找
+
+        platform_manager 尚未就绪时返回 None 且不缓存，下次连接重新解析。
+        """
+        if self._event_queue is None and self.context and self.context.platform_manager:
+            self._event_queue = self.context.platform_manager.event_queue
+        return self._event_queue
+
     async def _on_server_disconnect(self, server_id: str, reason: str):
         """处理服务器断开连接"""
         logger.warning(f"[MC-{server_id}] 已断开连接: {reason}")
 
         # 停止平台适配器
-        adapter = self._adapters.pop(server_id, None)
-        if adapter:
-            await adapter.stop()
+        await self._stop_adapter(server_id)
 
-        task = self._adapter_tasks.pop(server_id, None)
-        if task and not task.done():
-            task.cancel()
+    async def _stop_adapter(self, server_id: str):
+        """停止并移除服务器的平台适配器及其任务"""
+        entry = self._adapters.pop(server_id, None)
+        if entry:
+            await entry.adapter.stop()
+            if entry.task and not entry.task.done():
+                entry.task.cancel()
 
     # 命令处理器
 
@@ -280,7 +344,8 @@ class MinecraftAdapterPlugin(Star):
     @mc_group.command("cmd")
     async def cmd_execute(self, event: AstrMessageEvent, command=GreedyStr):
         """远程执行服务器指令"""
-        async for result in self._dispatch_command("handle_cmd", event, str(command)):
+        # GreedyStr 是 str 的子类，框架传入的已是拼接好的字符串，无需再复制一次
+        async for result in self._dispatch_command("handle_cmd", event, command):
             yield result
 
     @mc_group.command("bind")
@@ -297,12 +362,8 @@ class MinecraftAdapterPlugin(Star):
 
     async def _dispatch_command(self, method_name: str, event: AstrMessageEvent, *args):
         """统一分发到命令处理器，减少重复样板代码。"""
-        if not self.command_handler:
-            return
-
-        handler = getattr(self.command_handler, method_name, None)
-        if not handler:
-            logger.warning(f"[MC Adapter] 未找到命令处理方法: {method_name}")
+        handler = self._cmd_methods.get(method_name)
+        if handler is None:
             return
 
         async for result in handler(event, *args):
@@ -324,31 +385,46 @@ class MinecraftAdapterPlugin(Star):
         if event.is_at_or_wake_command:
             return
 
+        # 非转发目标会话的消息不需要创建转发协程
+        is_forward_session = self.message_bridge.is_forward_session(
+            event.unified_msg_origin
+        )
+
         if not self.command_handler:
             # No command handler, only try message forwarding
-            if await self.message_bridge.handle_external_message(event):
+            if is_forward_session and await self.message_bridge.handle_external_message(
+                event
+            ):
                 event.stop_event()
             return
 
-        text = event.get_message_str().strip()
-        umo = event.unified_msg_origin
-
-        # Handle pending server/backend selection (number input)
-        if text and text.isdigit() and self.command_handler.has_pending_action(umo):
-            async for result in self.command_handler.dispatch_number_selection(event):
-                yield result
-            event.stop_event()
-            return
+        # 纯图片/表情等无文本消息既不是编号也不会匹配指令，直接进入转发
+        if event.message_str:
+            # Handle pending server/backend selection (number input)
+            # 绝大多数消息所在会话没有待选操作，先查表，命中时才处理消息文本
+            if (
+                self.command_handler.has_pending_action(event.unified_msg_origin)
+                and event.message_str.strip().isdigit()
+            ):
+                async for result in self.command_handler.dispatch_number_selection(
+                    event
+                ):
+                    yield result
+                event.stop_event()
+                return
 
-        # Check custom commands
-        async for result in self.command_handler.handle_custom_command(event):
-            yield result
-        if event.get_extra("custom_cmd_matched"):
-            event.stop_event()
-            return
+            # Check custom commands
+            if self._has_custom_commands:
+                async for result in self.command_handler.handle_custom_command(event):
+                    yield result
+                if event.get_extra("custom_cmd_matched"):
+                    event.stop_event()
+                    return
 
         # Forward message to MC server(s)
-        if await self.message_bridge.handle_external_message(event):
+        if is_forward_session and await self.message_bridge.handle_external_message(
+            event
+        ):
             event.stop_event()
 
     async def terminate(self):
@@ -362,20 +438,36 @@ class MinecraftAdapterPlugin(Star):
                 await self._init_task
         self._init_task = None
 
-        # 停止所有适配器
-        for adapter in self._adapters.values():
-            await adapter.stop()
+        # 停止所有适配器并取消其任务
+        entries = list(self._adapters.values())
         self._adapters.clear()
+        results = await asyncio.gather(
+            *(entry.adapter.stop() for entry in entries), return_exceptions=True
+        )
+        for entry, result in zip(entries, results):
+            if isinstance(result, Exception):
+                logger.error(
+                    f"[MC Adapter] 停止适配器 {entry.adapter.server_config.server_id} 失败: {result}"
+                )
+        tasks = [entry.task for entry in entries if entry.task]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            for result in await asyncio.gather(*tasks, return_exceptions=True):
+                if isinstance(result, Exception):
+                    logger.error(f"[MC Adapter] 适配器任务异常退出: {result}")
 
-        # 取消所有适配器任务
-        for task in self._adapter_tasks.values():
-            if not task.done():
-                task.cancel()
-        if self._adapter_tasks:
-            await asyncio.gather(*self._adapter_tasks.values(), return_exceptions=True)
-        self._adapter_tasks.clear()
-
-        # 停止所有服务器连接
+        # 先停止所有服务器连接，不再接收新的 MC 消息
         await self.server_manager.stop_all()
 
+        # 再发送尚未合并发出的转发消息
+        await self.message_bridge.close()
+
+        # 写入防抖窗口内尚未保存的绑定变更
+        await self.binding_service.flush()
+
+        # 关闭渲染器的 HTTP 会话
+        if self.command_handler:
+            await self.command_handler.renderer.close()
+
         logger.info("[MC Adapter] 关闭完成")
@@ -1,6 +1,7 @@
 """Minecraft 平台适配器，用于 AI 聊天"""
 
 import asyncio
+from functools import lru_cache
 
 from astrbot.api import logger
 from astrbot.api.event import MessageChain
@@ -18,21 +19,22 @@ from ..core.models import (
     ChatMode,
     MCMessage,
     ServerConfig,
-)
-from ..core.models import (
-    MessageType as MCMessageType,
+    safe_enum,
 )
 from ..core.server_manager import ServerConnection
-from .event import MCMessageEvent
+from .event import MCMessageEvent, _extract_text
+
 
+@lru_cache(maxsize=256)
+def _parse_session(session_id: str) -> tuple[str, str, str] | None:
+    """解析会话格式: minecraft_serverid:MessageType:identifier
 
-def _extract_text(message_chain: MessageChain) -> str:
-    """Extract plain text content from a MessageChain."""
-    return "".join(
-        component.text
-        for component in message_chain.chain
-        if isinstance(component, Plain)
-    )
+    同一玩家/服务器的会话 ID 会被反复发送，解析结果按 ID 缓存。
+    """
+    parts = session_id.split(":", 2)
+    if len(parts) < 3:
+        return None
+    return parts[0], parts[1], parts[2]
 
 
 class MCPlatformAdapter(Platform):
@@ -47,15 +49,24 @@ class MCPlatformAdapter(Platform):
         super().__init__({}, event_queue)
         self.server_config = server_config
         self.server_connection = server_connection
+        # ws_client 随连接对象创建且重连时复用，发送方法可以预先绑定
+        self._send_chat_response = server_connection.ws_client.send_chat_response
         self._platform_name = f"minecraft_{server_config.server_id}"
         self._running = False
-
-    def meta(self) -> PlatformMetadata:
-        return PlatformMetadata(
+        self._stop_future: asyncio.Future | None = None
+        # 元数据与会话 ID 前缀在适配器生命周期内不变，每次聊天请求直接复用
+        self._meta = PlatformMetadata(
             name=self._platform_name,
-            description=f"Minecraft Server: {self.server_config.server_id}",
+            description=f"Minecraft Server: {server_config.server_id}",
             id=self._platform_name,
         )
+        self._group_session_id = f"{self._platform_name}:GroupMessage:Server"
+        self._private_session_prefix = f"{self._platform_name}:FriendMessage:"
+        # 群聊消息开头 @ 机器人的组件只读且固定，所有请求共用一个实例
+        self._bot_at = At(qq=server_config.server_id)
+
+    def meta(self) -> PlatformMetadata:
+        return self._meta
 
     async def send_by_session(
         self, session: MessageSesion, message_chain: MessageChain
@@ -69,19 +80,18 @@ class MCPlatformAdapter(Platform):
         # 示例:
         #   - minecraft_survival:FriendMessage:550e8400-e29b-41d4-a716-446655440000
         #   - minecraft_survival:GroupMessage:Server
-        session_parts = session.session_id.split(":", 2)
-
-        if len(session_parts) < 3:
+        parsed = _parse_session(session.session_id)
+        if parsed is None:
             logger.warning(
                 f"[MC-{self.server_config.server_id}] 无效的会话格式: {session.session_id}"
             )
             return
 
-        _, msg_type, identifier = session_parts
+        _, msg_type, identifier = parsed
 
         if msg_type == "FriendMessage":
             # 私聊给特定玩家
-            await self.server_connection.ws_client.send_chat_response(
+            await self._send_chat_response(
                 reply_to="",
                 target_type="PLAYER",
                 chat_mode="PRIVATE",
@@ -90,7 +100,7 @@ class MCPlatformAdapter(Platform):
             )
         else:
             # 广播消息 (群聊消息或其他类型)
-            await self.server_connection.ws_client.send_chat_response(
+            await self._send_chat_response(
                 reply_to="",
                 target_type="BROADCAST",
                 chat_mode="GROUP",
@@ -104,32 +114,32 @@ class MCPlatformAdapter(Platform):
         self._running = True
         logger.info(f"[MC-{self.server_config.server_id}] 平台适配器已启动")
         # 实际连接由 ServerManager 管理
-        # 此方法只是保持平台“活着”
-        # 使用 asyncio.Event 进行正确的异步等待
-        self._stop_event = asyncio.Event()
-        await self._stop_event.wait()
+        # 此方法只是保持平台“活着”，等待一个在 stop() 时完成的 Future
+        self._stop_future = asyncio.get_running_loop().create_future()
+        await self._stop_future
 
     async def stop(self):
         """停止平台适配器"""
         self._running = False
-        if hasattr(self, "_stop_event"):
-            self._stop_event.set()
+        if self._stop_future is not None and not self._stop_future.done():
+            self._stop_future.set_result(None)
 
     async def handle_chat_request(self, msg: MCMessage):
-        """处理来自 Minecraft 的聊天请求"""
-        if not self.server_config.enable_ai_chat:
-            return
-
-        if msg.type != MCMessageType.CHAT_REQUEST:
-            return
+        """处理来自 Minecraft 的聊天请求
 
+        调用方保证 msg 为 CHAT_REQUEST，且仅在启用 AI 聊天的服务器上创建适配器。
+        """
         if not msg.source:
             return
 
         payload = msg.payload
         chat_mode_str = payload.get("chatMode", "GROUP")
-        chat_mode = ChatMode(chat_mode_str)
+        # 值到成员的映射直接查表，未知模式按群聊处理
+        chat_mode = safe_enum(ChatMode, chat_mode_str, ChatMode.GROUP)
         content = payload.get("content", "")
+        # 空白内容没有可供 AI 回复的文本，不构造消息与事件
+        if not content or content.isspace():
+            return
 
         player_uuid = msg.source.player_uuid
         player_name = msg.source.player_name
@@ -138,19 +148,19 @@ class MCPlatformAdapter(Platform):
         abm = AstrBotMessage()
 
         # 根据聊天模式设置消息类型
-        if chat_mode == ChatMode.PRIVATE:
+        if chat_mode is ChatMode.PRIVATE:
             abm.type = MessageType.FRIEND_MESSAGE
-            abm.session_id = f"{self._platform_name}:FriendMessage:{player_uuid}"
+            abm.session_id = self._private_session_prefix + player_uuid
         else:
             abm.type = MessageType.GROUP_MESSAGE
             abm.group_id = "Server"
-            abm.session_id = f"{self._platform_name}:GroupMessage:Server"
+            abm.session_id = self._group_session_id
 
         abm.self_id = self.server_config.server_id
         abm.message_id = msg.id
         abm.sender = MessageMember(user_id=player_uuid, nickname=player_name)
-        if chat_mode == ChatMode.GROUP:
-            abm.message = [At(qq=abm.self_id), Plain(text=content)]
+        if chat_mode is ChatMode.GROUP:
+            abm.message = [self._bot_at, Plain(text=content)]
         else:
             abm.message = [Plain(text=content)]
         abm.message_str = content
@@ -160,7 +170,7 @@ class MCPlatformAdapter(Platform):
         event = MCMessageEvent(
             message_str=content,
             message_obj=abm,
-            platform_meta=self.meta(),
+            platform_meta=self._meta,
             session_id=abm.session_id,
             server_connection=self.server_connection,
             chat_mode=chat_mode,
@@ -171,6 +181,8 @@ class MCPlatformAdapter(Platform):
         # 将事件提交到队列
         self.commit_event(event)
         logger.debug(
-            f"[MC-{self.server_config.server_id}] "
-            f"来自 {player_name} 的聊天请求: {content[:50]}..."
+            "[MC-%s] 来自 %s 的聊天请求: %.50s...",
+            self.server_config.server_id,
+            player_name,
+            content,
         )
@@ -33,9 +33,14 @@ class MCMessageEvent(AstrMessageEvent):
     ):
         super().__init__(message_str, message_obj, platform_meta, session_id)
         self.server_connection = server_connection
+        self._send_chat_response = server_connection.ws_client.send_chat_response
         self.chat_mode = chat_mode
         self.request_id = request_id
         self.player_uuid = player_uuid
+        # 聊天模式在事件生命周期内不变，发送参数预先确定，send() 中不再分支
+        self._chat_mode_value = chat_mode.value
+        self._target_type = "BROADCAST" if chat_mode is ChatMode.GROUP else "PLAYER"
+        self._reply_player_uuid = player_uuid if chat_mode is ChatMode.PRIVATE else ""
 
     async def send(self, message: MessageChain):
         """将响应消息发送回 Minecraft"""
@@ -43,16 +48,13 @@ class MCMessageEvent(AstrMessageEvent):
         if not content:
             return
 
-        # 根据聊天模式确定目标类型
-        target_type = "BROADCAST" if self.chat_mode == ChatMode.GROUP else "PLAYER"
-
         # 通过 WebSocket 发送响应
-        await self.server_connection.ws_client.send_chat_response(
+        await self._send_chat_response(
             reply_to=self.request_id,
-            target_type=target_type,
-            chat_mode=self.chat_mode.value,
+            target_type=self._target_type,
+            chat_mode=self._chat_mode_value,
             content=content,
-            player_uuid=self.player_uuid if self.chat_mode == ChatMode.PRIVATE else "",
+            player_uuid=self._reply_player_uuid,
         )
 
         await super().send(message)
@@ -1,11 +1,20 @@
 """用户绑定服务，用于将外部平台用户与 MC 玩家关联"""
 
-import json
+import asyncio
+import contextlib
+import sys
+import time
 from dataclasses import dataclass, field
 from pathlib import Path
 
 from astrbot.api import logger
 
+from ..core.json_codec import json_dumps_pretty, json_loads
+
+SAVE_DEBOUNCE_SECONDS = (
+    0.5  # 绑定变更后延迟写盘的时间窗口，窗口内的多次变更合并为一次写入
+)
+
 
 @dataclass
 class UserBinding:
@@ -47,27 +56,34 @@ class UserBinding:
 class BindingStorage:
     """用户绑定的存储"""
 
-    # 键: "platform:user_id", 值: UserBinding
-    bindings: dict[str, UserBinding] = field(default_factory=dict)
-    # 反向索引: 键: mc_player_name (小写), 值: 绑定键列表
-    mc_name_index: dict[str, list[str]] = field(default_factory=dict)
+    # 键: (platform, user_id), 值: UserBinding
+    # 元组键查找时无需拼接字符串；仅在读写 JSON 时转换为 "platform:user_id"
+    bindings: dict[tuple[str, str], UserBinding] = field(default_factory=dict)
+    # 反向索引: 键: mc_player_name (小写), 值: 绑定键的有序集合
+    # （以 dict 作有序集合：O(1) 增删，同时保持绑定的先后顺序）
+    mc_name_index: dict[str, dict[tuple[str, str], None]] = field(default_factory=dict)
 
     def to_dict(self) -> dict:
         return {
-            "bindings": {k: v.to_dict() for k, v in self.bindings.items()},
+            "bindings": {
+                f"{platform}:{user_id}": v.to_dict()
+                for (platform, user_id), v in self.bindings.items()
+            },
         }
 
     @classmethod
     def from_dict(cls, data: dict) -> "BindingStorage":
         storage = cls()
-        for key, binding_data in data.get("bindings", {}).items():
+        for raw_key, binding_data in data.get("bindings", {}).items():
             binding = UserBinding.from_dict(binding_data)
+            platform, _, user_id = raw_key.partition(":")
+            # 平台名只有少数几种，驻留后所有绑定共用同一字符串对象
+            key = (sys.intern(platform), user_id)
+            binding.platform = sys.intern(binding.platform)
             storage.bindings[key] = binding
             # 构建索引
             mc_name_lower = binding.mc_player_name.lower()
-            if mc_name_lower not in storage.mc_name_index:
-                storage.mc_name_index[mc_name_lower] = []
-            storage.mc_name_index[mc_name_lower].append(key)
+            storage.mc_name_index.setdefault(mc_name_lower, {})[key] = None
         return storage
 
 
@@ -83,14 +99,19 @@ class BindingService:
         self.data_dir = Path(data_dir)
         self.data_file = self.data_dir / "mc_bindings.json"
         self._storage = BindingStorage()
+        self._dirty = False
+        self._flush_task: asyncio.Task | None = None
+        # 最近一次写入（或加载）的文件内容，内容未变化时跳过写盘
+        self._saved_payload: bytes | None = None
         self._load()
 
     def _load(self):
         """从文件加载绑定"""
         if self.data_file.exists():
             try:
-                with open(self.data_file, encoding="utf-8") as f:
-                    data = json.load(f)
+                raw = self.data_file.read_bytes()
+                data = json_loads(raw)
+                self._saved_payload = raw
                 self._storage = BindingStorage.from_dict(data)
                 logger.info(
                     f"[BindingService] 已加载 {len(self._storage.bindings)} 个绑定"
@@ -104,15 +125,55 @@ class BindingService:
     def _save(self):
         """保存绑定到文件"""
         try:
+            payload = json_dumps_pretty(self._storage.to_dict())
+            # 防抖窗口内绑定又解绑等情况下内容与磁盘一致，无需重写整个文件
+            if payload == self._saved_payload:
+                return
             self.data_dir.mkdir(parents=True, exist_ok=True)
-            with open(self.data_file, "w", encoding="utf-8") as f:
-                json.dump(self._storage.to_dict(), f, ensure_ascii=False, indent=2)
+            # 直接写入 UTF-8 字节，省去文本层编码
+            self.data_file.write_bytes(payload)
+            self._saved_payload = payload
         except Exception as e:
             logger.error(f"[BindingService] 保存绑定失败: {e}")
 
-    def _make_key(self, platform: str, user_id: str) -> str:
+    def _schedule_save(self):
+        """标记有未保存的变更，并在防抖窗口结束后统一写盘"""
+        self._dirty = True
+        if self._flush_task is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # 没有运行中的事件循环时直接保存
+            self._dirty = False
+            self._save()
+            return
+        self._flush_task = loop.create_task(self._delayed_flush())
+
+    async def _delayed_flush(self):
+        try:
+            await asyncio.sleep(SAVE_DEBOUNCE_SECONDS)
+            # 写入本身是同步的，取消只可能发生在等待期间，不会与 flush() 并发写文件
+            self._dirty = False
+            self._save()
+        finally:
+            self._flush_task = None
+
+    async def flush(self):
+        """立即写入尚未保存的变更（插件关闭时调用）"""
+        task = self._flush_task
+        if task is not None:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        if self._dirty:
+            self._dirty = False
+            self._save()
+
+    @staticmethod
+    def _make_key(platform: str, user_id: str) -> tuple[str, str]:
         """创建用户的唯一键"""
-        return f"{platform}:{user_id}"
+        return platform, user_id
 
     def bind(
         self,
@@ -127,8 +188,7 @@ class BindingService:
         返回:
             tuple: (成功, 消息)
         """
-        import time
-
+        platform = sys.intern(platform)
         key = self._make_key(platform, user_id)
 
         # 检查是否已绑定
@@ -154,11 +214,9 @@ class BindingService:
 
         # 更新索引
         mc_name_lower = mc_player_name.lower()
-        if mc_name_lower not in self._storage.mc_name_index:
-            self._storage.mc_name_index[mc_name_lower] = []
-        self._storage.mc_name_index[mc_name_lower].append(key)
+        self._storage.mc_name_index.setdefault(mc_name_lower, {})[key] = None
 
-        self._save()
+        self._schedule_save()
         logger.info(f"[BindingService] 已绑定 {platform}:{user_id} -> {mc_player_name}")
         return True, f"成功绑定玩家 {mc_player_name}"
 
@@ -177,17 +235,16 @@ class BindingService:
         mc_name_lower = binding.mc_player_name.lower()
 
         # 从索引中移除
-        if mc_name_lower in self._storage.mc_name_index:
-            self._storage.mc_name_index[mc_name_lower] = [
-                k for k in self._storage.mc_name_index[mc_name_lower] if k != key
-            ]
-            if not self._storage.mc_name_index[mc_name_lower]:
+        keys = self._storage.mc_name_index.get(mc_name_lower)
+        if keys is not None:
+            keys.pop(key, None)
+            if not keys:
                 del self._storage.mc_name_index[mc_name_lower]
 
         # 移除绑定
         del self._storage.bindings[key]
 
-        self._save()
+        self._schedule_save()
         logger.info(
             f"[BindingService] 已解绑 {platform}:{user_id} (原绑定玩家: {binding.mc_player_name})"
         )
@@ -208,7 +265,7 @@ class BindingService:
             该玩家的 UserBinding 对象列表
         """
         mc_name_lower = mc_player_name.lower()
-        keys = self._storage.mc_name_index.get(mc_name_lower, [])
+        keys = self._storage.mc_name_index.get(mc_name_lower, ())
         return [
             self._storage.bindings[key] for key in keys if key in self._storage.bindings
         ]
@@ -1,15 +1,28 @@
 """MC 与其他平台之间转发消息的消息桥接服务"""
 
+import asyncio
+import contextlib
 import re
 import time
+from collections.abc import Iterable
 from typing import TYPE_CHECKING
 
 from astrbot.api import logger
 from astrbot.api.event import AstrMessageEvent, MessageChain
 from astrbot.api.message_components import Plain
+from astrbot.api.platform import Platform
+from astrbot.core.platform.astr_message_event import MessageSesion
 
 from ..core.models import MCMessage, MessageType, ServerConfig
 
+# 表情回应仅 aiocqhttp (OneBot v11) 支持，平台适配器不可用时为 None
+try:
+    from astrbot.core.platform.sources.aiocqhttp.aiocqhttp_message_event import (
+        AiocqhttpMessageEvent,
+    )
+except ImportError:
+    AiocqhttpMessageEvent = None
+
 if TYPE_CHECKING:
     from astrbot.core.star.context import Context
 
@@ -22,6 +35,18 @@ EMOJI_THUMBS_UP = 76  # 👍
 EMOJI_LOVE = 66  # ❤️
 EMOJI_ROSE = 63  # 🌹
 
+# 玩家离开原因的展示文本
+QUIT_REASON_TEXT = {
+    "QUIT": "离开",
+    "KICK": "被踢出",
+    "TIMEOUT": "超时断开",
+}
+
+# 转发合并窗口（秒）：窗口内发往同一会话的消息合并为一条发送
+FORWARD_BATCH_WINDOW = 0.2
+# 单个会话缓冲的最大行数，达到后立即发送，不再等待窗口结束
+FORWARD_BATCH_MAX_LINES = 32
+
 
 class MessageBridge:
     """在 MC 服务器和 AstrBot 会话之间转发消息的服务"""
@@ -33,25 +58,49 @@ class MessageBridge:
         self._session_to_servers: dict[str, list[tuple[str, ServerConfig]]] = {}
         # 从 server_id 到配置的映射
         self._server_configs: dict[str, ServerConfig] = {}
+        # 从 server_id 到允许转发的 MC 消息类型的映射（注册时根据配置预先计算）
+        self._forward_types: dict[str, frozenset[MessageType]] = {}
         # Track recently forwarded messages to suppress echo
         # Key: (server_id, content_hash), Value: timestamp
         self._recently_forwarded: dict[tuple[str, str], float] = {}
         # Echo suppression window in seconds
         self._echo_suppress_window = 5.0
+        # 待合并发送的转发消息: 会话 UMO -> 消息行列表
+        self._pending_forwards: dict[str, list[str]] = {}
+        # 已达到行数上限、等待立即发送的批次: (会话 UMO, 消息行列表)
+        self._ready_forwards: list[tuple[str, list[str]]] = []
+        self._flush_task: asyncio.Task | None = None
+        # 有批次达到行数上限时置位，提前结束合并任务的等待
+        self._flush_wakeup = asyncio.Event()
+        # 会话 UMO -> (目标平台实例, 解析后的会话)，避免每次发送都解析 UMO 并遍历平台
+        self._session_targets: dict[str, tuple[Platform, MessageSesion]] = {}
 
     def register_server(self, config: ServerConfig):
         """注册用于消息转发的服务器"""
         self._server_configs[config.server_id] = config
 
+        forward_types: set[MessageType] = set()
+        if config.forward_chat_to_astrbot:
+            forward_types.add(MessageType.MESSAGE_FORWARD)
+        if config.forward_join_leave_to_astrbot:
+            forward_types.update((MessageType.PLAYER_JOIN, MessageType.PLAYER_QUIT))
+        self._forward_types[config.server_id] = frozenset(forward_types)
+
         # 为目标会话构建反向映射
+        entry = (config.server_id, config)
         for session in config.target_sessions:
-            if session not in self._session_to_servers:
-                self._session_to_servers[session] = []
-            self._session_to_servers[session].append((config.server_id, config))
+            self._session_to_servers.setdefault(session, []).append(entry)
+
+    def register_servers(self, configs: Iterable[ServerConfig]):
+        """批量注册用于消息转发的服务器"""
+        register = self.register_server
+        for config in configs:
+            register(config)
 
     def unregister_server(self, server_id: str):
         """从消息转发中取消注册服务器"""
         config = self._server_configs.pop(server_id, None)
+        self._forward_types.pop(server_id, None)
         if config:
             # 从反向映射中移除
             for session in config.target_sessions:
@@ -65,16 +114,14 @@ class MessageBridge:
     async def handle_mc_message(self, server_id: str, msg: MCMessage) -> bool:
         """处理来自 MC 服务器的消息并转发到目标会话
 
-        如果消息被转发则返回 True。
+        如果消息已加入转发队列则返回 True（实际发送由合并任务异步完成）。
         """
-        config = self._server_configs.get(server_id)
-        if not config:
+        # 检查是否已启用转发（未注册的服务器没有可转发类型）
+        if msg.type not in self._forward_types.get(server_id, ()):
             return False
+        config = self._server_configs[server_id]
 
-        # 检查是否已启用转发
-        if msg.type == MessageType.MESSAGE_FORWARD:
-            if not config.forward_chat_to_astrbot:
-                return False
+        if msg.type is MessageType.MESSAGE_FORWARD:
             # Suppress echo: if this message was recently forwarded FROM external
             content = msg.payload.get("content", "")
             echo_key = (server_id, content)
@@ -87,11 +134,6 @@ class MessageBridge:
                     del self._recently_forwarded[echo_key]
                     return False
                 del self._recently_forwarded[echo_key]
-        elif msg.type in (MessageType.PLAYER_JOIN, MessageType.PLAYER_QUIT):
-            if not config.forward_join_leave_to_astrbot:
-                return False
-        else:
-            return False
 
         # 获取目标会话
         targets = config.target_sessions
@@ -103,12 +145,86 @@ class MessageBridge:
         if not content:
             return False
 
-        # 发送到每个目标会话
+        # 加入合并缓冲，由定时任务统一发送
+        pending = self._pending_forwards
         for target_umo in targets:
-            await self._send_to_session(target_umo, content)
+            lines = pending.setdefault(target_umo, [])
+            lines.append(content)
+            if len(lines) >= FORWARD_BATCH_MAX_LINES:
+                # 达到上限的批次同步移出，后续消息进入新的缓冲，
+                # 突发期间事件循环来不及发送时每条消息也不会超过上限
+                self._ready_forwards.append((target_umo, lines))
+                del pending[target_umo]
+
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._run_flusher())
+        if self._ready_forwards:
+            # 有已满的批次：唤醒合并任务立即发送，而不是取消后重建任务
+            self._flush_wakeup.set()
 
         return True
 
+    async def _run_flusher(self):
+        """合并任务：等待合并窗口结束（或有批次达到上限）后发送缓冲的转发消息
+
+        发送期间到达的消息在本任务内开启下一个窗口，缓冲清空后任务退出；
+        任务运行期间始终由 _flush_task 持有引用，close() 可等待其发送完成。
+        """
+        try:
+            while self._pending_forwards or self._ready_forwards:
+                if not self._ready_forwards:
+                    with contextlib.suppress(asyncio.TimeoutError):
+                        await asyncio.wait_for(
+                            self._flush_wakeup.wait(), FORWARD_BATCH_WINDOW
+                        )
+                self._flush_wakeup.clear()
+                try:
+                    await self.flush_forwards()
+                except Exception as e:
+                    logger.error(f"[MessageBridge] 发送转发消息失败: {e}")
+        finally:
+            self._flush_task = None
+
+    async def flush_forwards(self):
+        """立即发送所有缓冲的转发消息
+
+        每个批次（最多 FORWARD_BATCH_MAX_LINES 行）合并为一条消息。
+        """
+        ready, self._ready_forwards = self._ready_forwards, []
+        pending, self._pending_forwards = self._pending_forwards, {}
+        if not ready and not pending:
+            return
+        # 内容相同的批次（通常是同一服务器的多个目标）共用一个消息链
+        chains: dict[str, MessageChain] = {}
+        per_session: dict[str, list[MessageChain]] = {}
+        for umo, lines in (*ready, *pending.items()):
+            content = "\n".join(lines)
+            chain = chains.get(content)
+            if chain is None:
+                chain = chains[content] = MessageChain([Plain(text=content)])
+            per_session.setdefault(umo, []).append(chain)
+        # 不同会话并发发送，同一会话的多个批次按顺序发送
+        # （_send_to_session 内部已处理异常）
+        await asyncio.gather(
+            *(
+                self._send_chains(umo, session_chains)
+                for umo, session_chains in per_session.items()
+            )
+        )
+
+    async def _send_chains(self, umo: str, chains: list[MessageChain]):
+        for chain in chains:
+            await self._send_to_session(umo, chain)
+
+    async def close(self):
+        """发送剩余的转发消息，并等待合并任务中正在进行的发送完成"""
+        task = self._flush_task
+        if task is not None:
+            # 唤醒合并任务跳过等待窗口，由其发送剩余消息后自行退出
+            self._flush_wakeup.set()
+            await task
+        await self.flush_forwards()
+
     def _format_mc_message(self, msg: MCMessage, config: ServerConfig) -> str:
         """
         格式化 MC 消息以转发到外部平台。
@@ -123,74 +239,111 @@ class MessageBridge:
         注意:
             支持 MESSAGE_FORWARD、PLAYER_JOIN 和 PLAYER_QUIT 消息类型。
         """
-        if msg.type == MessageType.MESSAGE_FORWARD:
-            player_name = msg.source.player_name if msg.source else "未知"
-            content = msg.payload.get("content", "")
-            return config.forward_chat_format.format(
-                player=player_name, message=content
-            )
-
-        if msg.type in (MessageType.PLAYER_JOIN, MessageType.PLAYER_QUIT):
-            player_name = msg.source.player_name if msg.source else "未知"
-            server_name = msg.source.server_name if msg.source else ""
-            online = msg.payload.get("onlineCount", 0)
-            max_players = msg.payload.get("maxPlayers", 0)
-            count_part = f" ({online}/{max_players})" if max_players else ""
-            server_part = f" {server_name}" if server_name else "服务器"
-
-            if msg.type == MessageType.PLAYER_JOIN:
-                return f"🟢 {player_name} 加入了{server_part}{count_part}"
-
-            reason = msg.payload.get("reason", "QUIT")
-            reason_text = {
-                "QUIT": "离开",
-                "KICK": "被踢出",
-                "TIMEOUT": "超时断开",
-            }.get(reason, "离开")
-            return f"🔴 {player_name} {reason_text}了{server_part}{count_part}"
-
-        return ""
-
-    async def _send_to_session(self, umo: str, content: str):
+        formatter = self._formatters.get(msg.type)
+        return formatter(msg, config) if formatter else ""
+
+    @staticmethod
+    def _format_chat(msg: MCMessage, config: ServerConfig) -> str:
+        """格式化聊天消息"""
+        player_name = msg.source.player_name if msg.source else "未知"
+        content = msg.payload.get("content", "")
+        return config.forward_chat_format.format(player=player_name, message=content)
+
+    @staticmethod
+    def _format_join_quit(msg: MCMessage, config: ServerConfig) -> str:
+        """格式化玩家加入/离开消息"""
+        player_name = msg.source.player_name if msg.source else "未知"
+        server_name = msg.source.server_name if msg.source else ""
+        online = msg.payload.get("onlineCount", 0)
+        max_players = msg.payload.get("maxPlayers", 0)
+        count_part = f" ({online}/{max_players})" if max_players else ""
+        server_part = f" {server_name}" if server_name else "服务器"
+
+        if msg.type is MessageType.PLAYER_JOIN:
+            return f"🟢 {player_name} 加入了{server_part}{count_part}"
+
+        reason = msg.payload.get("reason", "QUIT")
+        reason_text = QUIT_REASON_TEXT.get(reason, "离开")
+        return f"🔴 {player_name} {reason_text}了{server_part}{count_part}"
+
+    # 消息类型 -> 格式化函数
+    _formatters = {
+        MessageType.MESSAGE_FORWARD: _format_chat,
+        MessageType.PLAYER_JOIN: _format_join_quit,
+        MessageType.PLAYER_QUIT: _format_join_quit,
+    }
+
+    async def _send_to_session(self, umo: str, message_chain: MessageChain):
         """
         通过平台管理器发送消息到特定会话。
 
         参数:
             umo: 格式为 'platform:type:id' 的统一消息源
-            content: 要发送的消息内容
+            message_chain: 要发送的消息链
 
         注意:
             解析 UMO 以查找目标平台并通过平台管理器发送。
             如果 UMO 格式无效或找不到平台，则记录警告。
         """
         try:
-            # 创建消息链
-            message_chain = MessageChain([Plain(text=content)])
+            target = self._resolve_session_target(umo)
+            if target is not None:
+                platform, session = target
+                await platform.send_by_session(session, message_chain)
+                return
 
-            # 使用 Context 直接发送，内部会解析 UMO
+            # 未能解析时交给 Context 发送，内部会解析 UMO
             sent = await self.context.send_message(umo, message_chain)
             if not sent:
                 logger.warning(f"[MessageBridge] 未找到平台: {umo}")
 
         except Exception as e:
-            logger.error(f"[MessageBridge] 发送消息失败: {e}")
+            logger.error(f"[MessageBridge] 发送消息到 {umo} 失败: {e}")
+
+    def _resolve_session_target(
+        self, umo: str
+    ) -> tuple[Platform, MessageSesion] | None:
+        """查找会话对应的平台实例，结果按 UMO 缓存
+
+        平台被重新加载后缓存的实例不再出现在平台列表中，此时重新查找。
+        """
+        platform_manager = self.context.platform_manager
+        if platform_manager is None:
+            return None
+        platforms = platform_manager.platform_insts
+
+        target = self._session_targets.get(umo)
+        if target is not None and target[0] in platforms:
+            return target
+
+        session = MessageSesion.from_str(umo)
+        for platform in platforms:
+            if platform.meta().id == session.platform_name:
+                target = (platform, session)
+                self._session_targets[umo] = target
+                return target
+        self._session_targets.pop(umo, None)
+        return None
+
+    def is_forward_session(self, umo: str) -> bool:
+        """会话是否是某个服务器的转发目标（同步检查，供调用方在 await 前过滤）"""
+        return umo in self._session_to_servers
 
     async def handle_external_message(self, event: AstrMessageEvent) -> bool:
         """处理来自外部平台的消息并在需要时转发到 MC
 
-        如果消息被转发则返回 True。
+        如果消息已加入转发队列则返回 True（实际发送由合并任务异步完成）。
         """
-        # 获取消息内容
-        message_str = event.message_str
-        umo = event.unified_msg_origin
+        # 通过反向映射直接取出以此会话为目标的服务器，无需逐个扫描配置；
+        # 绝大多数消息来自未绑定的会话，在此直接返回
+        servers = self._session_to_servers.get(event.unified_msg_origin)
+        if not servers:
+            return False
 
-        # 检查每个服务器配置
+        message_str = event.message_str
+        sender: tuple[str, str, str] | None = None
         any_forwarded = False
-        for server_id, config in self._server_configs.items():
-            # 检查此会话是否在目标会话列表中
-            if not config.target_sessions or umo not in config.target_sessions:
-                continue
-
+        for server_id, config in servers:
             # 前缀为空时转发全部消息，否则检查前缀
             if config.auto_forward_prefix:
                 if not message_str.startswith(config.auto_forward_prefix):
@@ -203,14 +356,17 @@ class MessageBridge:
             if not content:
                 continue
 
-            # 获取发送者信息
-            sender_name = event.get_sender_name()
-            sender_id = event.get_sender_id()
-            platform_name = event.get_platform_name()
-
             # 发送到 MC 服务器
             server = self.server_manager.get_server(server_id)
             if server and server.connected:
+                # 发送者信息只在首次实际转发时获取
+                if sender is None:
+                    sender = (
+                        event.get_platform_name(),
+                        event.get_sender_id(),
+                        event.get_sender_name(),
+                    )
+                platform_name, sender_id, sender_name = sender
                 success = await server.ws_client.send_incoming_message(
                     platform=platform_name,
                     user_id=sender_id,
@@ -289,15 +445,12 @@ class MessageBridge:
         if platform_name != "aiocqhttp":
             return
 
-        try:
-            # 运行时惰性导入以避免循环依赖
-            from astrbot.core.platform.sources.aiocqhttp.aiocqhttp_message_event import (
-                AiocqhttpMessageEvent,
-            )
-
-            if not isinstance(event, AiocqhttpMessageEvent):
-                return
+        if AiocqhttpMessageEvent is None or not isinstance(
+            event, AiocqhttpMessageEvent
+        ):
+            return
 
+        try:
             # 获取机器人口端
             client = event.bot
             message_id = event.message_obj.message_id
@@ -311,7 +464,7 @@ class MessageBridge:
 
             await client.api.call_action("set_msg_emoji_like", **payloads)
             logger.debug(
-                f"[MessageBridge] 已对消息 {message_id} 作出表情响应 {emoji_id}"
+                "[MessageBridge] 已对消息 %s 作出表情响应 %s", message_id, emoji_id
             )
 
         except Exception as e:
@@ -69,6 +69,19 @@ class InfoRenderer:
         self._font_path = self._font_dir / self._FONT_FILENAME
         self._assets_ready = False
         self._asset_lock = asyncio.Lock()
+        self._http: aiohttp.ClientSession | None = None
+
+    async def _get_http(self) -> aiohttp.ClientSession:
+        """获取复用的 HTTP 会话（头像、字体下载共用）"""
+        if self._http is None or self._http.closed:
+            self._http = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10))
+        return self._http
+
+    async def close(self):
+        """关闭 HTTP 会话"""
+        if self._http and not self._http.closed:
+            await self._http.close()
+        self._http = None
 
     async def _ensure_assets(self):
         if self._assets_ready:
@@ -85,13 +98,13 @@ class InfoRenderer:
         if self._font_path.exists() and self._font_path.stat().st_size > 0:
             return
         timeout = aiohttp.ClientTimeout(total=20)
+        session = await self._get_http()
         for url in self._FONT_URLS:
             try:
-                async with aiohttp.ClientSession(timeout=timeout) as session:
-                    async with session.get(url) as resp:
-                        if resp.status != 200:
-                            continue
-                        data = await resp.read()
+                async with session.get(url, timeout=timeout) as resp:
+                    if resp.status != 200:
+                        continue
+                    data = await resp.read()
                 if len(data) < 100 * 1024:
                     continue
                 self._font_path.write_bytes(data)
@@ -277,69 +290,66 @@ class InfoRenderer:
     async def _fetch_avatar_face(
         self, player_name: str, player_uuid: str
     ) -> Image.Image | None:
-        timeout = aiohttp.ClientTimeout(total=10)
         name = self._norm(player_name)
         uuid = self._norm(player_uuid).replace("-", "")
         try:
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                if name:
-                    for url in (
-                        f"https://mc-heads.net/avatar/{quote(name)}/8",
-                        f"https://minotar.net/helm/{quote(name)}/8.png",
-                    ):
-                        img = await self._download_image(session, url)
-                        if img is not None:
-                            return img.resize((8, 8), Image.Resampling.NEAREST)
-                if uuid:
-                    for url in (
-                        f"https://crafatar.com/avatars/{uuid}?size=8&overlay",
-                        f"https://mc-heads.net/avatar/{uuid}/8",
-                    ):
-                        img = await self._download_image(session, url)
-                        if img is not None:
-                            return img.resize((8, 8), Image.Resampling.NEAREST)
-
-                resolved_uuid = uuid
-                if not resolved_uuid and name:
-                    lookup = (
-                        f"https://api.mojang.com/users/profiles/minecraft/{quote(name)}"
-                    )
-                    async with session.get(lookup) as resp:
-                        if resp.status == 200:
-                            profile = await resp.json(content_type=None)
-                            resolved_uuid = str(profile.get("id", ""))
-                if not resolved_uuid:
-                    return None
+            session = await self._get_http()
+            if name:
+                for url in (
+                    f"https://mc-heads.net/avatar/{quote(name)}/8",
+                    f"https://minotar.net/helm/{quote(name)}/8.png",
+                ):
+                    img = await self._download_image(session, url)
+                    if img is not None:
+                        return img.resize((8, 8), Image.Resampling.NEAREST)
+            if uuid:
+                for url in (
+                    f"https://crafatar.com/avatars/{uuid}?size=8&overlay",
+                    f"https://mc-heads.net/avatar/{uuid}/8",
+                ):
+                    img = await self._download_image(session, url)
+                    if img is not None:
+                        return img.resize((8, 8), Image.Resampling.NEAREST)
+
+            resolved_uuid = uuid
+            if not resolved_uuid and name:
+                lookup = (
+                    f"https://api.mojang.com/users/profiles/minecraft/{quote(name)}"
+                )
+                async with session.get(lookup) as resp:
+                    if resp.status == 200:
+                        profile = await resp.json(content_type=None)
+                        resolved_uuid = str(profile.get("id", ""))
+            if not resolved_uuid:
+                return None
 
-                profile_url = f"https://sessionserver.mojang.com/session/minecraft/profile/{resolved_uuid}"
-                async with session.get(profile_url) as resp:
-                    if resp.status != 200:
-                        return None
-                    profile_data = await resp.json(content_type=None)
-
-                textures_b64 = ""
-                for prop in profile_data.get("properties", []):
-                    if prop.get("name") == "textures":
-                        textures_b64 = prop.get("value", "")
-                        break
-                if not textures_b64:
+            profile_url = f"https://sessionserver.mojang.com/session/minecraft/profile/{resolved_uuid}"
+            async with session.get(profile_url) as resp:
+                if resp.status != 200:
                     return None
+                profile_data = await resp.json(content_type=None)
+
+            textures_b64 = ""
+            for prop in profile_data.get("properties", []):
+                if prop.get("name") == "textures":
+                    textures_b64 = prop.get("value", "")
+                    break
+            if not textures_b64:
+                return None
 
-                decoded = base64.b64decode(textures_b64).decode("utf-8")
-                textures_obj = json.loads(decoded)
-                skin_url = (
-                    textures_obj.get("textures", {}).get("SKIN", {}).get("url", "")
-                )
-                if not skin_url:
-                    return None
-                skin = await self._download_image(session, skin_url)
-                if skin is None or skin.width < 16 or skin.height < 16:
-                    return None
-                face = skin.crop((8, 8, 16, 16))
-                if skin.width >= 64 and skin.height >= 16:
-                    overlay = skin.crop((40, 8, 48, 16))
-                    face = Image.alpha_composite(face, overlay)
-                return face
+            decoded = base64.b64decode(textures_b64).decode("utf-8")
+            textures_obj = json.loads(decoded)
+            skin_url = textures_obj.get("textures", {}).get("SKIN", {}).get("url", "")
+            if not skin_url:
+                return None
+            skin = await self._download_image(session, skin_url)
+            if skin is None or skin.width < 16 or skin.height < 16:
+                return None
+            face = skin.crop((8, 8, 16, 16))
+            if skin.width >= 64 and skin.height >= 16:
+                overlay = skin.crop((40, 8, 48, 16))
+                face = Image.alpha_composite(face, overlay)
+            return face
         except Exception as exc:
             logger.debug(
                 f"[Renderer] 获取玩家头像失败: {player_name}/{player_uuid} -> {exc}"
@@ -370,6 +380,21 @@ class InfoRenderer:
             avatar.save(path, format="PNG")
         return avatar
 
+    @staticmethod
+    def _png_bytes(image: Image.Image) -> BytesIO:
+        out = BytesIO()
+        image.save(out, format="PNG", optimize=True)
+        out.seek(0)
+        return out
+
+    async def _encode_png(self, image: Image.Image) -> BytesIO:
+        """在工作线程中编码 PNG
+
+        optimize 压缩是渲染中最耗 CPU 的一步，放到线程中执行（Pillow 编码时释放 GIL），
+        避免阻塞事件循环上的 WebSocket 消息处理。
+        """
+        return await asyncio.to_thread(self._png_bytes, image)
+
     def _new_card(self, estimate_h: int) -> tuple[Image.Image, ImageDraw.ImageDraw]:
         img = Image.new("RGB", (self._CARD_W, max(estimate_h, 240)), self._CARD_BG)
         return img, ImageDraw.Draw(img)
@@ -382,10 +407,7 @@ class InfoRenderer:
         pad: int = 10,
     ) -> BytesIO:
         if len(images) == 1:
-            out = BytesIO()
-            images[0].save(out, format="PNG", optimize=True)
-            out.seek(0)
-            return out
+            return await self._encode_png(images[0])
         bg = background or self._OUTER_BG
         max_width = max(im.width for im in images)
         total_h = sum(im.height for im in images) + gap * (len(images) - 1) + pad * 2
@@ -395,10 +417,7 @@ class InfoRenderer:
             x = (merged.width - im.width) // 2
             merged.paste(im, (x, y))
             y += im.height + gap
-        out = BytesIO()
-        merged.save(out, format="PNG", optimize=True)
-        out.seek(0)
-        return out
+        return await self._encode_png(merged)
 
     async def _render_server_status_image(
         self,
@@ -537,10 +556,7 @@ class InfoRenderer:
                 y += 60
 
         card = image.crop((0, 0, self._CARD_W, min(max(y + 28, 280), image.height)))
-        out = BytesIO()
-        card.save(out, format="PNG", optimize=True)
-        out.seek(0)
-        return out
+        return await self._encode_png(card)
 
     def _effective_player_server_id(self, player: "PlayerDetail", fallback: str) -> str:
         """玩家详情展示用服务器名：群组服优先后端子服，避免展示代理层名称。"""
@@ -672,10 +688,7 @@ class InfoRenderer:
                 y += 8
 
         card = image.crop((0, 0, self._CARD_W, min(max(y + 20, 240), image.height)))
-        out = BytesIO()
-        card.save(out, format="PNG", optimize=True)
-        out.seek(0)
-        return out
+        return await self._encode_png(card)
 
     async def _render_player_detail_image(
         self, player: "PlayerDetail", server_tag: str = ""
@@ -809,10 +822,7 @@ class InfoRenderer:
             y += h + 24
 
         card = image.crop((0, 0, self._CARD_W, min(max(y + 10, 260), image.height)))
-        out = BytesIO()
-        card.save(out, format="PNG", optimize=True)
-        out.seek(0)
-        return out
+        return await self._encode_png(card)
 
     async def render_multi_server_status(
         self,
@@ -0,0 +1,14 @@
+"""测试配置：把插件目录注册为包，使插件内的相对导入可用"""
+
+import sys
+import types
+from pathlib import Path
+
+PLUGIN_DIR = Path(__file__).resolve().parent.parent
+PACKAGE = "astrbot_plugin_minecraft_adapter"
+
+# 只注册包路径而不执行插件的 __init__.py（其会导入 main 并注册 Star）
+if PACKAGE not in sys.modules:
+    package = types.ModuleType(PACKAGE)
+    package.__path__ = [str(PLUGIN_DIR)]
+    sys.modules[PACKAGE] = package
@@ -0,0 +1,48 @@
+"""指令黑白名单检查的测试"""
+
+import pytest
+
+pytest.importorskip("astrbot")
+pytest.importorskip("aiohttp")
+
+from astrbot_plugin_minecraft_adapter.core.models import ServerConfig
+from astrbot_plugin_minecraft_adapter.handlers.commands import (
+    CommandHandler,
+)
+
+
+@pytest.fixture
+def handler() -> CommandHandler:
+    return CommandHandler(None, None, None, lambda server_id: None)
+
+
+def _config(mode: str) -> ServerConfig:
+    return ServerConfig.from_dict(
+        {
+            "server": {"server_id": "test"},
+            "cmd": {"cmd_white_black_list": mode, "cmd_list": ["op", "stop"]},
+        }
+    )
+
+
+@pytest.mark.parametrize(
+    "command",
+    ["op Steve", "OP Steve", "op\tSteve", "stop\n", "op\u3000Steve", "  stop"],
+)
+def test_blacklist_blocks_any_whitespace(handler, command):
+    assert not handler._check_command_allowed(command, _config("black"))
+
+
+@pytest.mark.parametrize("command", ["list", "opx Steve", "say op"])
+def test_blacklist_allows_other_commands(handler, command):
+    assert handler._check_command_allowed(command, _config("black"))
+
+
+@pytest.mark.parametrize("command", ["op\tSteve", "stop\n", "op\u3000Steve"])
+def test_whitelist_matches_any_whitespace(handler, command):
+    assert handler._check_command_allowed(command, _config("white"))
+
+
+@pytest.mark.parametrize("command", ["", "   ", "\t\n"])
+def test_empty_command_rejected(handler, command):
+    assert not handler._check_command_allowed(command, _config("none"))